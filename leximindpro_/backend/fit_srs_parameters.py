@@ -0,0 +1,21 @@
+"""Offline SRS parameter fit.
+
+Run outside the API process, e.g. nightly from cron:
+
+    python fit_srs_parameters.py
+"""
+import asyncio
+
+from server import client, fit_srs_parameters, logger
+
+
+async def main():
+    try:
+        fitted = await fit_srs_parameters()
+        logger.info(f"Fitted SRS parameters for {fitted} users")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
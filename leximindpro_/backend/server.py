@@ -1,22 +1,39 @@
 from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi.responses import Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReplaceOne, ReturnDocument, UpdateOne, UpdateMany
+from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
+import asyncio
+import csv
+import io
 import os
+import time
 import logging
 import json
+import multiprocessing
 import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Literal, Dict
+from typing import List, Optional, Literal, Dict, Any, AsyncIterator, Awaitable, Callable
 from collections import defaultdict
 import uuid
-from datetime import datetime, timezone, timedelta
+import hashlib
+from datetime import date, datetime, timezone, timedelta
 import jwt
+import numpy as np
 from passlib.context import CryptContext
 import random
+from cachetools import TTLCache
 from openai import OpenAI
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -351,7 +368,8 @@ class Season(BaseModel):
     end_date: str  # 4 weeks later
     weeks: List[str] = []  # List of league IDs for this season
     final_standings: List[dict] = []  # [{user_id, username, total_points, rank, badges}]
-    status: str = "active"  # active, completed
+    status: str = "active"  # active, finalizing, completed (superseded: duplicate active season)
+    standings_materialized: bool = False  # season_standings read model is complete
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
 class PersonalizedLearningPlan(BaseModel):
@@ -374,6 +392,8 @@ class UserWordProgress(BaseModel):
     repetition: int = 0
     next_review: str = Field(default_factory=lambda: datetime.now(timezone.utc).date().isoformat())
     last_result: Optional[str] = None  # again, hard, good, easy
+    introduced_on: str = Field(default_factory=lambda: datetime.now(timezone.utc).date().isoformat())
+    last_reviewed_on: Optional[str] = None
 
 class PronunciationTest(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -446,6 +466,29 @@ class TeacherReport(BaseModel):
     pdf_url: Optional[str] = None
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
+class ReportJobCreate(BaseModel):
+    scope: Literal["student", "class", "institution"]
+    target_id: str  # student id, class name or institution id
+
+class ReportJob(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    teacher_id: str
+    scope: str
+    target_id: str
+    cache_key: str
+    week_start: str
+    week_end: str
+    status: str = "queued"  # queued, running, completed, failed
+    total: int = 0
+    completed: int = 0
+    artifact_id: Optional[str] = None
+    error: Optional[str] = None
+    claim_id: Optional[str] = None
+    heartbeat_at: Optional[str] = None
+    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    finished_at: Optional[str] = None
+
 class UserAchievement(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -487,6 +530,10 @@ class ReviewUpdate(BaseModel):
     word_id: str
     rating: Literal["again", "hard", "good", "easy"]
 
+class ReviewBatchUpdate(BaseModel):
+    """All ratings of one review session, in the order they were given."""
+    reviews: List[ReviewUpdate] = Field(min_length=1, max_length=200)
+
 class FavoritesUpdate(BaseModel):
     word_id: str
 
@@ -521,7 +568,11 @@ def get_week_range(reference: Optional[datetime] = None) -> tuple[str, str]:
     return week_start.isoformat(), week_end.isoformat()
 
 def sanitize_quiz_for_student(quiz: dict, include_answers: bool = False) -> dict:
-    """Remove sensitive fields from quiz when sending to students."""
+    """Remove sensitive fields from quiz when sending to students.
+
+    The result is shared by every student (it is cached); apply_quiz_variant
+    turns it into one student's question/option order.
+    """
     if not quiz:
         return {}
     sanitized = {k: v for k, v in quiz.items() if k != "_id"}
@@ -539,6 +590,124 @@ def sanitize_quiz_for_student(quiz: dict, include_answers: bool = False) -> dict
     sanitized["questions"] = sanitized_questions
     return sanitized
 
+def quiz_variant(quiz: dict, user_id: str) -> tuple[List[int], Dict[str, List[int]]]:
+    """Deterministic per-student question order and option orders.
+
+    Seeded from (quiz_id, user_id), so no per-student copy is stored.
+    ``option_orders[question_id][shown_index]`` is the original option index.
+    """
+    seed = hashlib.sha256(f"{quiz['id']}:{user_id}".encode()).digest()
+    rng = random.Random(int.from_bytes(seed[:8], "big"))
+    questions = quiz.get("questions", [])
+    question_order = list(range(len(questions)))
+    rng.shuffle(question_order)
+    option_orders = {}
+    for question in questions:
+        order = list(range(len(question.get("options", []))))
+        rng.shuffle(order)
+        option_orders[question["id"]] = order
+    return question_order, option_orders
+
+def _shown_option(order: List[int], original: Optional[int]) -> Optional[int]:
+    return order.index(original) if original in order else original
+
+def apply_quiz_variant(sanitized: dict, user_id: str) -> dict:
+    """Reorder an already sanitized quiz into the student's variant."""
+    question_order, option_orders = quiz_variant(sanitized, user_id)
+    questions = sanitized.get("questions", [])
+    variant_questions = []
+    for idx in question_order:
+        question = questions[idx]
+        order = option_orders[question["id"]]
+        variant = {**question, "options": [question["options"][i] for i in order]}
+        if "correct_option_index" in question:
+            variant["correct_option_index"] = _shown_option(order, question["correct_option_index"])
+        variant_questions.append(variant)
+    return {**sanitized, "questions": variant_questions}
+
+def grade_quiz_answers(quiz: dict, user_id: str, answers: List[dict]) -> tuple[List[dict], int]:
+    """Grade answers given in the student's variant; stored answers use original option indexes.
+
+    Answers for unknown questions or with an out-of-range option are dropped.
+    """
+    question_map = {q["id"]: q for q in quiz.get("questions", [])}
+    _, option_orders = quiz_variant(quiz, user_id)
+    evaluated_answers = []
+    correct_count = 0
+    for answer in answers:
+        question_id = answer.get("question_id")
+        shown_option = answer.get("selected_option")
+        if question_id not in question_map or shown_option is None:
+            continue
+        order = option_orders[question_id]
+        if not isinstance(shown_option, int) or not 0 <= shown_option < len(order):
+            continue
+        selected_option = order[shown_option]
+
+        question = question_map[question_id]
+        is_correct = selected_option == question.get("correct_option_index")
+        if is_correct:
+            correct_count += 1
+
+        evaluated_answers.append({
+            "question_id": question_id,
+            "selected_option": selected_option,
+            "correct_option_index": question.get("correct_option_index"),
+            "is_correct": is_correct
+        })
+    return evaluated_answers, correct_count
+
+def localize_quiz_result(result: dict, quiz: dict, user_id: str) -> dict:
+    """Map a stored result (original option indexes) onto the student's variant."""
+    _, option_orders = quiz_variant(quiz, user_id)
+    answers = []
+    for answer in result.get("answers", []):
+        order = option_orders.get(answer.get("question_id"))
+        if order:
+            answer = {
+                **answer,
+                "selected_option": _shown_option(order, answer.get("selected_option")),
+                "correct_option_index": _shown_option(order, answer.get("correct_option_index"))
+            }
+        answers.append(answer)
+    return {**result, "answers": answers}
+
+# In-flight creations per key; concurrent callers in this worker share one task
+_inflight_tasks: Dict[str, asyncio.Future] = {}
+
+async def single_flight(key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+    """Run ``factory`` once per key; concurrent callers await the same result."""
+    task = _inflight_tasks.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        _inflight_tasks[key] = task
+
+        def _release(done: asyncio.Future, key: str = key) -> None:
+            if _inflight_tasks.get(key) is done:
+                _inflight_tasks.pop(key, None)
+
+        task.add_done_callback(_release)
+    # shield: a cancelled request must not cancel the creation other callers wait on
+    return await asyncio.shield(task)
+
+async def get_or_create(collection, key_filter: dict, document: dict) -> dict:
+    """Idempotent insert keyed by ``key_filter`` (backed by a unique index).
+
+    Returns the stored document, whether it was inserted by this call or by a
+    concurrent writer in another worker.
+    """
+    try:
+        return await collection.find_one_and_update(
+            key_filter,
+            {"$setOnInsert": document},
+            upsert=True,
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # Another worker inserted between our match and insert
+        return await collection.find_one(key_filter, {"_id": 0})
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """Get current user WITHOUT password field for security"""
     try:
@@ -599,6 +768,171 @@ def require_admin(current_user: dict = Depends(get_current_user)):
 
 # ============= INITIALIZE DEFAULT DATA =============
 
+class RequiredIndexError(RuntimeError):
+    """A unique index that correctness depends on could not be built."""
+
+DUPLICATE_KEY_ERROR = 11000
+
+async def _create_index(
+    collection,
+    keys,
+    required: bool = False,
+    dedupe: Optional[Callable[[], Awaitable[None]]] = None,
+    **kwargs
+):
+    """create_index that tolerates failures of performance-only indexes.
+
+    ``dedupe`` collapses duplicates left from before a unique index existed;
+    it only runs when the build fails on a duplicate key, then the build is
+    retried once.
+    """
+    try:
+        await collection.create_index(keys, **kwargs)
+    except OperationFailure as e:
+        if dedupe is not None and e.code == DUPLICATE_KEY_ERROR:
+            logger.warning(f"Duplicates block index {keys} on {collection.name}, collapsing them")
+            await dedupe()
+            return await _create_index(collection, keys, required=required, **kwargs)
+        if required:
+            raise RequiredIndexError(f"Index {keys} on {collection.name} could not be created: {e}") from e
+        # Performance-only index: keep serving without it
+        logger.warning(f"Index {keys} on {collection.name} could not be created: {e}")
+
+async def _duplicate_groups(collection, key_fields: List[str], match: Optional[dict] = None) -> List[List[Any]]:
+    """``_id`` lists (oldest first) of documents sharing the same ``key_fields`` values."""
+    pipeline = [
+        {"$match": match or {}},
+        {"$sort": {"_id": 1}},
+        {"$group": {
+            "_id": {field: f"${field}" for field in key_fields},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ]
+    return [group["ids"] for group in await collection.aggregate(pipeline, allowDiskUse=True).to_list(None)]
+
+async def _archive_and_delete(collection, ids: List[Any]):
+    """Move documents to <collection>_duplicates (idempotent), then delete them."""
+    documents = await collection.find({"_id": {"$in": ids}}).to_list(None)
+    if documents:
+        await db[f"{collection.name}_duplicates"].bulk_write(
+            [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in documents]
+        )
+    await collection.delete_many({"_id": {"$in": ids}})
+
+# Duplicates created before the natural-key unique indexes existed. Each
+# collapser runs only when its index build fails (or from the maintenance
+# endpoint); removed documents are kept in *_duplicates collections.
+
+async def dedupe_leagues():
+    """Keep the oldest league per week."""
+    for ids in await _duplicate_groups(db.leagues, ["week_number", "year"]):
+        await _archive_and_delete(db.leagues, ids[1:])
+        logger.warning(f"Removed {len(ids) - 1} duplicate league(s), kept {ids[0]}")
+
+async def dedupe_weekly_quizzes():
+    """Keep the quiz most students answered (oldest on ties) so results stay attached."""
+    for ids in await _duplicate_groups(db.weekly_quizzes, ["week_start"]):
+        quizzes = await db.weekly_quizzes.find({"_id": {"$in": ids}}, {"_id": 1, "id": 1}).to_list(None)
+        result_counts = {
+            quiz["_id"]: await db.weekly_quiz_results.count_documents({"quiz_id": quiz.get("id")})
+            for quiz in quizzes
+        }
+        keep = max(ids, key=lambda _id: (result_counts.get(_id, 0), -ids.index(_id)))
+        await _archive_and_delete(db.weekly_quizzes, [_id for _id in ids if _id != keep])
+        logger.warning(f"Removed {len(ids) - 1} duplicate weekly quiz(zes), kept {keep}")
+
+async def dedupe_quiz_results():
+    """Double submissions: the first one stands."""
+    for ids in await _duplicate_groups(db.weekly_quiz_results, ["quiz_id", "user_id"]):
+        await _archive_and_delete(db.weekly_quiz_results, ids[1:])
+        logger.warning(f"Removed {len(ids) - 1} duplicate quiz result(s), kept {ids[0]}")
+
+async def dedupe_active_seasons():
+    """Keep the earliest active season, mark the others superseded."""
+    active_seasons = await db.seasons.find(
+        {"status": "active"}, {"_id": 1}
+    ).sort([("start_date", 1), ("_id", 1)]).to_list(None)
+    if len(active_seasons) > 1:
+        await db.seasons.update_many(
+            {"_id": {"$in": [season["_id"] for season in active_seasons[1:]]}},
+            {"$set": {"status": "superseded"}}
+        )
+        logger.warning(f"Marked {len(active_seasons) - 1} extra active season(s) as superseded")
+
+async def dedupe_natural_keys():
+    await dedupe_leagues()
+    await dedupe_weekly_quizzes()
+    await dedupe_quiz_results()
+    await dedupe_active_seasons()
+
+@api_router.post("/admin/maintenance/dedupe-natural-keys")
+async def run_natural_key_dedupe(current_user: dict = Depends(require_role("admin"))):
+    await single_flight("dedupe_natural_keys", dedupe_natural_keys)
+    return {"message": "Yinelenen kayıtlar temizlendi."}
+
+async def ensure_indexes():
+    """Create the indexes the API relies on (idempotent, runs on startup)."""
+    # Natural keys for get-or-create documents: one league per ISO week,
+    # one quiz per week and at most one active season. get_or_create is only
+    # race-free across workers with these in place, so they are required.
+    await _create_index(db.leagues, [("week_number", 1), ("year", 1)], required=True, dedupe=dedupe_leagues, unique=True)
+    await _create_index(db.weekly_quizzes, "week_start", required=True, dedupe=dedupe_weekly_quizzes, unique=True)
+    # Unique: one result per student and quiz, the only resubmission guard
+    await _create_index(
+        db.weekly_quiz_results, [("quiz_id", 1), ("user_id", 1)], required=True, dedupe=dedupe_quiz_results, unique=True
+    )
+    # Institutions overview: classes grouped per institution
+    await _create_index(db.classes, [("institution_id", 1), ("name", 1)])
+    # Daily activity rollup: upsert key per user/day and cross-user day ranges
+    await _create_index(db.user_daily_activity, [("user_id", 1), ("date", 1)], unique=True)
+    await _create_index(db.user_daily_activity, [("date", 1), ("user_id", 1)])
+    # Weekly report totals: date window first, then the page's students
+    await _create_index(db.game_scores, [("created_at", 1), ("user_id", 1)])
+    # Per-student quiz history and summaries (latest first)
+    await _create_index(db.weekly_quiz_results, [("user_id", 1), ("submitted_at", -1)])
+    await _create_index(
+        db.seasons,
+        "status",
+        required=True,
+        dedupe=dedupe_active_seasons,
+        unique=True,
+        partialFilterExpression={"status": "active"},
+        name="one_active_season"
+    )
+    # Season standings read model: upsert key and the ranked page query
+    await _create_index(db.season_standings, [("season_id", 1), ("user_id", 1)], unique=True)
+    await _create_index(db.season_standings, [("season_id", 1), ("total_points", -1), ("user_id", 1)])
+    await _create_index(db.season_standings, [("season_id", 1), ("class_name", 1), ("total_points", -1)])
+    await _create_index(db.season_standings, [("season_id", 1), ("institution_id", 1), ("total_points", -1)])
+    # Leaderboards: global and per class / institution partitions
+    await _create_index(db.users, [("role", 1), ("points", -1)])
+    await _create_index(db.users, [("role", 1), ("class_name", 1), ("points", -1)])
+    await _create_index(db.users, [("role", 1), ("institution_id", 1), ("points", -1)])
+    # Teacher tenant scope: institution first, then the owned classes
+    await _create_index(db.users, [("institution_id", 1), ("role", 1), ("class_name", 1), ("username", 1)])
+    await _create_index(db.classes, "teacher_id")
+    await _create_index(db.classes, "created_by")
+    await _create_index(db.game_scores, [("user_id", 1), ("game_type", 1)])
+    await _create_index(db.users, [("institution_id", 1), ("role", 1), ("class_name", 1), ("last_login_date", 1)])
+    # Teacher dashboard action lists, one document per class
+    await _create_index(db.class_actions, [("institution_id", 1), ("class_name", 1)], unique=True)
+    # Report jobs: lookups by id, in-flight dedup by cache key, one artifact per key
+    await _create_index(db.report_jobs, "id", unique=True)
+    await _create_index(db.report_jobs, [("cache_key", 1), ("status", 1)])
+    await _create_index(db.report_jobs, [("status", 1), ("heartbeat_at", 1)])
+    await _create_index(db.report_artifacts, "cache_key", unique=True)
+    await _create_index(db.report_artifacts, "id", unique=True)
+    await _create_index(db.report_artifacts, "week_start")
+    # SRS: one progress document per user/word, review queue in due order
+    await _create_index(db.user_word_progress, [("user_id", 1), ("word_id", 1)], unique=True)
+    await _create_index(db.user_word_progress, [("user_id", 1), ("next_review", 1), ("ease_factor", 1)])
+    await _create_index(db.user_word_progress, [("user_id", 1), ("introduced_on", 1)])
+    await _create_index(db.review_log, [("user_id", 1), ("reviewed_at", 1)])
+    await _create_index(db.review_log, "reviewed_at")
+    await _create_index(db.srs_parameters, "user_id", unique=True)
+
 async def initialize_data():
     # Check if admin exists
     admin = await db.users.find_one({"username": "admin"})
@@ -819,13 +1153,11 @@ async def create_user(user_create: UserCreate, current_user: dict = Depends(requ
         institution = await db.institutions.find_one({"id": user_create.institution_id})
         if not institution:
             raise HTTPException(status_code=404, detail="Kurum bulunamadı.")
-        if user_create.role == "teacher":
-            teacher_count = await db.users.count_documents({"role": "teacher", "institution_id": user_create.institution_id})
-            if teacher_count >= institution.get("teacher_limit", 5):
+        if user_create.role in ("teacher", "student"):
+            members = (await count_institution_members([user_create.institution_id]))[user_create.institution_id]
+            if user_create.role == "teacher" and members["teacher"] >= institution.get("teacher_limit", 5):
                 raise HTTPException(status_code=400, detail="Bu kurum için öğretmen kotası dolu.")
-        if user_create.role == "student":
-            student_count = await db.users.count_documents({"role": "student", "institution_id": user_create.institution_id})
-            if student_count >= institution.get("student_limit", 100):
+            if user_create.role == "student" and members["student"] >= institution.get("student_limit", 100):
                 raise HTTPException(status_code=400, detail="Bu kurum için öğrenci kotası dolu.")
         institution_name = institution.get("name")
     
@@ -862,6 +1194,61 @@ async def delete_user(user_id: str, current_user: dict = Depends(require_role("a
 
 # ============= WORD MANAGEMENT =============
 
+# Word hydration: a WordLoader lives for one request and coalesces every
+# load() issued in the same event-loop turn into one $in query. Nothing
+# outlives the request, so word edits are visible to every worker at once.
+
+class WordLoader:
+    """Request-scoped batching loader for words by id (DataLoader style)."""
+
+    def __init__(self):
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._pending: List[str] = []
+
+    def _future(self, word_id: str) -> asyncio.Future:
+        future = self._futures.get(word_id)
+        if future is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        future = self._futures[word_id] = loop.create_future()
+        if not self._pending:
+            # Dispatch after the other loads queued in this turn have run
+            loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+        self._pending.append(word_id)
+        return future
+
+    async def _dispatch(self):
+        word_ids, self._pending = self._pending, []
+        try:
+            words = await db.words.find({"id": {"$in": word_ids}}, {"_id": 0}).to_list(len(word_ids))
+        except Exception as exc:
+            for word_id in word_ids:
+                self._futures.pop(word_id).set_exception(exc)
+            return
+        found = {word["id"]: word for word in words}
+        for word_id in word_ids:
+            self._futures[word_id].set_result(found.get(word_id))
+
+    def prime(self, words: List[dict]):
+        """Seed the loader with words the handler already fetched."""
+        loop = asyncio.get_running_loop()
+        for word in words:
+            if word["id"] not in self._futures:
+                future = self._futures[word["id"]] = loop.create_future()
+                future.set_result(word)
+
+    async def load(self, word_id: str) -> Optional[dict]:
+        word = await self._future(word_id)
+        return dict(word) if word is not None else None
+
+    async def load_many(self, word_ids: List[str]) -> List[dict]:
+        """Words for ``word_ids`` in the given order; unknown ids are dropped."""
+        words = await asyncio.gather(*(self.load(word_id) for word_id in word_ids))
+        return [word for word in words if word is not None]
+
+def get_word_loader() -> WordLoader:
+    return WordLoader()
+
 # Kelime Yönetimi için yeni endpoint (WordModel kullanarak)
 # GÜVENLİK: Sadece admin ve teacher erişebilir (JWT token gerekli)
 @api_router.post("/v1/words", status_code=status.HTTP_201_CREATED)
@@ -1084,17 +1471,248 @@ async def get_game_scores(current_user: dict = Depends(get_current_user)):
     scores = await db.game_scores.find({"user_id": current_user["id"]}, {"_id": 0}).sort("created_at", -1).to_list(100)
     return [GameScore(**score) for score in scores]
 
+# ============= DAILY ACTIVITY ROLLUP =============
+
+# user_daily_activity: one document per user per UTC day, incremented when a
+# game score or quiz result is written. Activity charts read this instead of
+# the raw game_scores / weekly_quiz_results collections.
+DAILY_ACTIVITY_COUNTERS = ("games_played", "correct_answers", "quizzes_completed")
+
+async def record_daily_activity(user_id: str, when: datetime, **counters: int):
+    """Add ``counters`` (see DAILY_ACTIVITY_COUNTERS) to the user's rollup for ``when``'s day.
+
+    Best effort: the rollup is derived data (backfill_daily_activity repairs
+    it), so a failure is logged and never fails the write that triggered it.
+    """
+    try:
+        await db.user_daily_activity.update_one(
+            {"user_id": user_id, "date": when.astimezone(timezone.utc).date().isoformat()},
+            {"$inc": {name: counters.get(name, 0) for name in DAILY_ACTIVITY_COUNTERS}},
+            upsert=True
+        )
+    except PyMongoError:
+        logger.exception(f"Daily activity rollup not updated for user {user_id}")
+
+async def backfill_daily_activity():
+    """Rebuild user_daily_activity from the raw collections (idempotent).
+
+    Counters of past days are overwritten with recomputed totals. Today's
+    counters belong to the live $inc writes, which may land between the
+    aggregation read and the merge, so an existing document for today is
+    left as is and only missing ones are inserted.
+    """
+    today = datetime.now(timezone.utc).date().isoformat()
+
+    def past_days_only(*counters: str) -> List[dict]:
+        return [{"$set": {
+            name: {"$cond": [{"$lt": ["$date", today]}, f"$$new.{name}", f"${name}"]}
+            for name in counters
+        }}]
+
+    # Timestamps are stored as UTC ISO strings, the first 10 bytes are the day
+    day_key = {"$substrBytes": ["$created_at", 0, 10]}
+    await db.game_scores.aggregate([
+        {"$match": {"created_at": {"$type": "string"}}},
+        {"$group": {
+            "_id": {"user_id": "$user_id", "date": day_key},
+            "games_played": {"$sum": 1},
+            "correct_answers": {"$sum": {"$ifNull": ["$correct_answers", 0]}}
+        }},
+        {"$project": {
+            "_id": 0, "user_id": "$_id.user_id", "date": "$_id.date",
+            "games_played": 1, "correct_answers": 1
+        }},
+        {"$merge": {
+            "into": "user_daily_activity",
+            "on": ["user_id", "date"],
+            "whenMatched": past_days_only("games_played", "correct_answers"),
+            "whenNotMatched": "insert"
+        }}
+    ], allowDiskUse=True).to_list(None)
+
+    await db.weekly_quiz_results.aggregate([
+        {"$match": {"submitted_at": {"$type": "string"}}},
+        {"$group": {
+            "_id": {"user_id": "$user_id", "date": {"$substrBytes": ["$submitted_at", 0, 10]}},
+            "quizzes_completed": {"$sum": 1}
+        }},
+        {"$project": {"_id": 0, "user_id": "$_id.user_id", "date": "$_id.date", "quizzes_completed": 1}},
+        {"$merge": {
+            "into": "user_daily_activity",
+            "on": ["user_id", "date"],
+            "whenMatched": past_days_only("quizzes_completed"),
+            "whenNotMatched": "insert"
+        }}
+    ], allowDiskUse=True).to_list(None)
+    logger.info("user_daily_activity backfill finished")
+
+@api_router.post("/admin/maintenance/backfill-daily-activity")
+async def run_daily_activity_backfill(current_user: dict = Depends(require_role("admin"))):
+    await single_flight("backfill_daily_activity", backfill_daily_activity)
+    return {"message": "Günlük aktivite özeti yeniden oluşturuldu."}
+
+# ============= CLASS ACTION LISTS =============
+
+# class_actions: one document per (institution_id, class_name) holding the
+# students flagged as struggling and the class-wide word error counts. Both
+# are updated when the underlying event is written, so the teacher dashboard
+# reads a handful of small documents instead of scanning every student.
+STRUGGLING_ACCURACY = 0.5
+STRUGGLING_WINDOW = timedelta(days=1)
+INACTIVE_AFTER = timedelta(days=3)
+
+def _class_key(student: dict) -> dict:
+    return {"institution_id": student.get("institution_id"), "class_name": student.get("class_name")}
+
+async def flag_struggling_student(student: dict, accuracy: float, when: datetime):
+    """Add ``student`` to their class's struggling list, dropping stale entries (best effort)."""
+    flagged_at = when.astimezone(timezone.utc).isoformat()
+    cutoff = (when - STRUGGLING_WINDOW).astimezone(timezone.utc).isoformat()
+    entry = {
+        "user_id": student["id"],
+        "username": student.get("username", ""),
+        "accuracy": round(accuracy, 3),
+        "flagged_at": flagged_at
+    }
+    try:
+        await db.class_actions.update_one(
+            _class_key(student),
+            [{"$set": {
+                "struggling": {"$concatArrays": [
+                    {"$filter": {
+                        "input": {"$ifNull": ["$struggling", []]},
+                        "cond": {"$and": [
+                            {"$ne": ["$$this.user_id", student["id"]]},
+                            {"$gte": ["$$this.flagged_at", cutoff]}
+                        ]}
+                    }},
+                    [{"$literal": entry}]
+                ]},
+                "updated_at": flagged_at
+            }}],
+            upsert=True
+        )
+    except PyMongoError:
+        logger.exception(f"Struggling flag not recorded for user {student['id']}")
+
+async def record_class_word_error(student: dict, word_id: str):
+    try:
+        await db.class_actions.update_one(
+            _class_key(student),
+            {
+                "$inc": {f"word_errors.{word_id}": 1},
+                "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}
+            },
+            upsert=True
+        )
+    except PyMongoError:
+        logger.exception(f"Class word error not recorded for user {student['id']}")
+
+async def rebuild_class_actions():
+    """Recompute every class_actions document from users and recent quiz results."""
+    started_at = datetime.now(timezone.utc)
+    classes: Dict[tuple, dict] = defaultdict(lambda: {"struggling": [], "word_errors": {}})
+
+    async for row in db.users.aggregate([
+        {"$match": {"role": "student", "word_errors": {"$type": "object", "$ne": {}}}},
+        {"$project": {
+            "institution_id": 1, "class_name": 1,
+            "word_errors": {"$objectToArray": "$word_errors"}
+        }},
+        {"$unwind": "$word_errors"},
+        {"$group": {
+            "_id": {
+                "institution_id": "$institution_id",
+                "class_name": "$class_name",
+                "word_id": "$word_errors.k"
+            },
+            "count": {"$sum": "$word_errors.v"}
+        }}
+    ], allowDiskUse=True):
+        key = (row["_id"].get("institution_id"), row["_id"].get("class_name"))
+        classes[key]["word_errors"][row["_id"]["word_id"]] = row["count"]
+
+    recent_results = await db.weekly_quiz_results.find(
+        {"submitted_at": {"$gte": (started_at - STRUGGLING_WINDOW).isoformat()}},
+        {"_id": 0, "user_id": 1, "total_questions": 1, "correct_answers": 1, "submitted_at": 1}
+    ).to_list(None)
+    low_results = {}
+    for result in recent_results:
+        total_questions = result.get("total_questions") or 0
+        accuracy = (result.get("correct_answers") or 0) / total_questions if total_questions else 0
+        if accuracy < STRUGGLING_ACCURACY:
+            low_results[result["user_id"]] = (accuracy, result["submitted_at"])
+    if low_results:
+        async for student in db.users.find(
+            {"id": {"$in": list(low_results)}},
+            {"_id": 0, "id": 1, "username": 1, "institution_id": 1, "class_name": 1}
+        ):
+            accuracy, flagged_at = low_results[student["id"]]
+            classes[(student.get("institution_id"), student.get("class_name"))]["struggling"].append({
+                "user_id": student["id"],
+                "username": student.get("username", ""),
+                "accuracy": round(accuracy, 3),
+                "flagged_at": flagged_at
+            })
+
+    updated_at = datetime.now(timezone.utc).isoformat()
+    if classes:
+        await db.class_actions.bulk_write([
+            UpdateOne(
+                {"institution_id": institution_id, "class_name": class_name},
+                {"$set": {**actions, "updated_at": updated_at}},
+                upsert=True
+            )
+            for (institution_id, class_name), actions in classes.items()
+        ])
+    # Classes with nothing to report any more
+    await db.class_actions.delete_many({"updated_at": {"$lt": started_at.isoformat()}})
+    logger.info(f"class_actions rebuilt for {len(classes)} classes")
+
+@api_router.post("/admin/maintenance/rebuild-class-actions")
+async def run_class_actions_rebuild(current_user: dict = Depends(require_role("admin"))):
+    await single_flight("rebuild_class_actions", rebuild_class_actions)
+    return {"message": "Sınıf eylem listeleri yeniden oluşturuldu."}
+
 # ============= LEADERBOARD =============
 
+# Ranking cache: (scope field, value) pairs -> top 100 rows, short TTL so
+# points earned elsewhere show up quickly.
+LEADERBOARD_SIZE = 100
+_leaderboard_cache: TTLCache = TTLCache(maxsize=1024, ttl=30)
+
+def leaderboard_scope(class_name: Optional[str] = None, institution_id: Optional[str] = None) -> dict:
+    """Filter for a leaderboard partition; empty dict means the global board."""
+    scope = {}
+    if class_name:
+        scope["class_name"] = class_name
+    if institution_id:
+        scope["institution_id"] = institution_id
+    return scope
+
 @api_router.get("/leaderboard")
-async def get_leaderboard(period: str = "all", current_user: dict = Depends(get_current_user)):
-    # For now, just return all users sorted by points
-    users = await db.users.find(
-        {"role": "student"},
-        {"_id": 0, "password": 0}
-    ).sort("points", -1).to_list(100)
-    
-    return [{"username": u["username"], "points": u.get("points", 0), "words_learned": u.get("words_learned", 0)} for u in users]
+async def get_leaderboard(
+    period: str = "all",
+    class_name: Optional[str] = None,
+    institution_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    # All-time points, globally or per class / institution
+    scope = leaderboard_scope(class_name, institution_id)
+    cache_key = tuple(sorted(scope.items()))
+    leaderboard = _leaderboard_cache.get(cache_key)
+    if leaderboard is None:
+        # Served by the (role, class_name|institution_id, points) indexes
+        users = await db.users.find(
+            {"role": "student", **scope},
+            {"_id": 0, "username": 1, "points": 1, "words_learned": 1}
+        ).sort("points", -1).to_list(LEADERBOARD_SIZE)
+        leaderboard = [
+            {"username": u["username"], "points": u.get("points", 0), "words_learned": u.get("words_learned", 0)}
+            for u in users
+        ]
+        _leaderboard_cache[cache_key] = leaderboard
+    return leaderboard
 
 # ============= ACHIEVEMENTS =============
 
@@ -1147,11 +1765,15 @@ async def check_achievements(user_id: str):
 # ============= AI STORY GENERATION =============
 
 @api_router.post("/ai/generate-story")
-async def generate_story(story_request: StoryRequest, current_user: dict = Depends(get_current_user)):
+async def generate_story(
+    story_request: StoryRequest,
+    current_user: dict = Depends(get_current_user),
+    word_loader: WordLoader = Depends(get_word_loader)
+):
     try:
         # Get some words to include in the story
         if story_request.word_ids:
-            words = await db.words.find({"id": {"$in": story_request.word_ids}}, {"_id": 0}).to_list(20)
+            words = await word_loader.load_many(story_request.word_ids[:20])
         else:
             words = await db.words.find({}, {"_id": 0}).to_list(20)
         word_list = [f"{w['english']}" for w in random.sample(words, min(5, len(words)))]
@@ -1321,14 +1943,14 @@ async def bulk_upload_words(upload: BulkWordsUpload, current_user: dict = Depend
 # ============= AI QUESTION GENERATION =============
 
 @api_router.post("/ai/generate-questions")
-async def generate_questions(question_request: QuestionRequest, current_user: dict = Depends(get_current_user)):
+async def generate_questions(
+    question_request: QuestionRequest,
+    current_user: dict = Depends(get_current_user),
+    word_loader: WordLoader = Depends(get_word_loader)
+):
     try:
         # Get words
-        words = []
-        for word_id in question_request.word_ids:
-            word = await db.words.find_one({"id": word_id}, {"_id": 0})
-            if word:
-                words.append(word)
+        words = await word_loader.load_many(question_request.word_ids)
         
         if not words:
             raise HTTPException(status_code=400, detail="No valid words found")
@@ -1396,51 +2018,115 @@ async def update_league_rankings():
                 {"$set": {"league_rank": standing.get("rank")}}
             )
 
+async def create_weekly_league(now: datetime, week_number: int, year: int) -> dict:
+    """Create this week's league idempotently (unique on week_number + year)."""
+    key_filter = {"week_number": week_number, "year": year}
+    league = await db.leagues.find_one(key_filter, {"_id": 0})
+    if league:
+        return league
+
+    start_of_week = now - timedelta(days=now.weekday())
+    end_of_week = start_of_week + timedelta(days=6)
+
+    # Get all student points
+    students = await db.users.find({"role": "student"}, {"_id": 0, "password": 0}).to_list(1000)
+    standings = sorted(
+        [
+            {
+                "user_id": s["id"],
+                "username": s["username"],
+                "points": s.get("points", 0),
+                "class_name": s.get("class_name"),
+                "institution_id": s.get("institution_id")
+            }
+            for s in students
+        ],
+        key=lambda x: x["points"],
+        reverse=True
+    )
+
+    # Add ranks
+    for idx, standing in enumerate(standings):
+        standing["rank"] = idx + 1
+
+    new_league = League(
+        week_number=week_number,
+        year=year,
+        start_date=start_of_week.isoformat(),
+        end_date=end_of_week.isoformat(),
+        standings=standings
+    )
+    league = await get_or_create(db.leagues, key_filter, new_league.model_dump())
+    if league["id"] == new_league.id:
+        await record_league_points(league, [], league["standings"])
+
+    # Only the stored league's standings are authoritative (another worker may have won)
+    for standing in league.get("standings", []):
+        await db.users.update_one(
+            {"id": standing["user_id"]},
+            {"$set": {"league_rank": standing.get("rank")}}
+        )
+    return league
+
 @api_router.get("/league/current")
-async def get_current_league(current_user: dict = Depends(get_current_user)):
+async def get_current_league(
+    class_name: Optional[str] = None,
+    institution_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
     # Get or create current week's league
     now = datetime.now(timezone.utc)
     week_number = now.isocalendar()[1]
     year = now.year
     
     league = await db.leagues.find_one({"week_number": week_number, "year": year}, {"_id": 0})
-    
+
     if not league:
-        # Create new league for this week
-        start_of_week = now - timedelta(days=now.weekday())
-        end_of_week = start_of_week + timedelta(days=6)
-        
-        # Get all student points
-        students = await db.users.find({"role": "student"}, {"_id": 0, "password": 0}).to_list(1000)
-        standings = sorted(
-            [{"user_id": s["id"], "username": s["username"], "points": s.get("points", 0)} for s in students],
-            key=lambda x: x["points"],
-            reverse=True
+        # Week flip: every concurrent request lands here, create the league once
+        league = await single_flight(
+            f"league:{year}:{week_number}",
+            lambda: create_weekly_league(now, week_number, year)
         )
-        
-        # Add ranks
-        for idx, standing in enumerate(standings):
-            standing["rank"] = idx + 1
-            # Update user's league_rank
-            await db.users.update_one(
-                {"id": standing["user_id"]},
-                {"$set": {"league_rank": idx + 1}}
-            )
-        
-        league = League(
-            week_number=week_number,
-            year=year,
-            start_date=start_of_week.isoformat(),
-            end_date=end_of_week.isoformat(),
-            standings=standings
-        )
-        await db.leagues.insert_one(league.model_dump())
     else:
         # Update league rankings in user records
         await update_league_rankings()
-    
+
+    scope = leaderboard_scope(class_name, institution_id)
+    if scope:
+        league = {**league, "standings": await scoped_league_standings(scope)}
+
     return league
 
+async def scoped_league_standings(scope: dict) -> List[dict]:
+    """Class / institution league standings read from the users partition index.
+
+    Leagues stored before standings carried class_name / institution_id
+    cannot be filtered, so the partition is ranked by current points like
+    /leaderboard; rank stays the global league rank.
+    """
+    cache_key = ("league", *sorted(scope.items()))
+    standings = _leaderboard_cache.get(cache_key)
+    if standings is None:
+        # Served by the (role, class_name|institution_id, points) indexes
+        users = await db.users.find(
+            {"role": "student", **scope},
+            {"_id": 0, "id": 1, "username": 1, "points": 1, "class_name": 1, "institution_id": 1, "league_rank": 1}
+        ).sort([("points", -1), ("id", 1)]).to_list(1000)
+        standings = [
+            {
+                "user_id": u["id"],
+                "username": u["username"],
+                "points": u.get("points", 0),
+                "class_name": u.get("class_name"),
+                "institution_id": u.get("institution_id"),
+                "rank": u.get("league_rank"),
+                "scope_rank": idx + 1
+            }
+            for idx, u in enumerate(users)
+        ]
+        _leaderboard_cache[cache_key] = standings
+    return standings
+
 @api_router.post("/league/update")
 async def update_league_standings():
     """Update league standings - can be called by cron job or manually"""
@@ -1450,7 +2136,16 @@ async def update_league_standings():
     
     students = await db.users.find({"role": "student"}, {"_id": 0, "password": 0}).to_list(1000)
     standings = sorted(
-        [{"user_id": s["id"], "username": s["username"], "points": s.get("points", 0)} for s in students],
+        [
+            {
+                "user_id": s["id"],
+                "username": s["username"],
+                "points": s.get("points", 0),
+                "class_name": s.get("class_name"),
+                "institution_id": s.get("institution_id")
+            }
+            for s in students
+        ],
         key=lambda x: x["points"],
         reverse=True
     )
@@ -1463,11 +2158,15 @@ async def update_league_standings():
             {"$set": {"league_rank": idx + 1}}
         )
     
-    await db.leagues.update_one(
+    previous = await db.leagues.find_one_and_update(
         {"week_number": week_number, "year": year},
         {"$set": {"standings": standings}},
-        upsert=True
+        upsert=True,
+        projection={"_id": 0, "id": 1, "start_date": 1, "end_date": 1, "standings": 1},
+        return_document=ReturnDocument.BEFORE
     )
+    # A league upserted here has no dates yet and so is not counted by the season either
+    await record_league_points(previous or {}, (previous or {}).get("standings", []), standings)
     
     return {"message": "League updated"}
 
@@ -1482,7 +2181,10 @@ async def check_weekly_reset():
     
     if not league:
         # Auto-create new league for this week
-        await update_league_standings()
+        await single_flight(
+            f"league:{year}:{week_number}",
+            lambda: create_weekly_league(now, week_number, year)
+        )
         logger.info(f"New league created for week {week_number}, year {year}")
 
 def calculate_xp_from_level(xp: int) -> int:
@@ -1516,136 +2218,166 @@ async def get_current_season():
     return await create_new_season()
 
 async def create_new_season():
-    """Create a new 4-week season"""
+    """Create a new 4-week season (at most one active season, see ensure_indexes)"""
+    return await single_flight("season:active", _create_new_season)
+
+async def _create_new_season() -> dict:
     now = datetime.now(timezone.utc)
-    
+
     # Get last season number
     last_season = await db.seasons.find_one(sort=[("season_number", -1)])
     season_number = 1 if not last_season else last_season["season_number"] + 1
-    
+
     start_date = now
     end_date = now + timedelta(weeks=4)
-    
+
     season = Season(
         season_number=season_number,
         year=now.year,
         start_date=start_date.isoformat(),
         end_date=end_date.isoformat(),
-        status="active"
+        status="active",
+        standings_materialized=True  # starts empty, filled by record_league_points
     )
-    
-    await db.seasons.insert_one(season.model_dump())
-    logger.info(f"New season {season_number} created")
-    return season
 
-async def finalize_season(season_id: str):
-    """Finalize season and award prizes to top 3"""
-    season = await db.seasons.find_one({"id": season_id})
-    if not season or season["status"] != "active":
-        return
-    
-    # Get all leagues in this season
+    stored = await get_or_create(db.seasons, {"status": "active"}, season.model_dump())
+    if stored["id"] == season.id:
+        logger.info(f"New season {season_number} created")
+    return stored
+
+SEASON_XP_BONUSES = [500, 300, 100]  # 1st: 500, 2nd: 300, 3rd: 100
+SEASON_BADGES = ["🌟", "⭐", "✨"]
+
+def _season_window(season: dict) -> tuple:
+    start_date = datetime.fromisoformat(season["start_date"].replace('Z', '+00:00'))
+    end_date = datetime.fromisoformat(season["end_date"].replace('Z', '+00:00'))
+    return start_date.isoformat(), end_date.isoformat()
+
+def season_league_match(season: dict) -> dict:
+    """Leagues that count toward ``season``: its listed weeks, else those inside its window."""
     league_ids = season.get("weeks", [])
-    if not league_ids:
-        # Get all leagues between start and end date
-        start_date = datetime.fromisoformat(season["start_date"].replace('Z', '+00:00'))
-        end_date = datetime.fromisoformat(season["end_date"].replace('Z', '+00:00'))
-        
-        leagues = await db.leagues.find({
-            "start_date": {"$gte": start_date.isoformat()},
-            "end_date": {"$lte": end_date.isoformat()}
-        }).to_list(100)
-        
-        league_ids = [l["id"] for l in leagues]
-    
-    # Calculate total points for each student across all weeks
-    student_totals = {}
-    for league_id in league_ids:
-        league = await db.leagues.find_one({"id": league_id})
-        if league:
-            for standing in league.get("standings", []):
-                user_id = standing["user_id"]
-                if user_id not in student_totals:
-                    student_totals[user_id] = {
-                        "username": standing["username"],
-                        "total_points": 0,
-                        "weeks_participated": 0
-                    }
-                student_totals[user_id]["total_points"] += standing.get("points", 0)
-                student_totals[user_id]["weeks_participated"] += 1
-    
-    # Sort by total points
-    final_standings = sorted(
-        [{"user_id": uid, **data} for uid, data in student_totals.items()],
-        key=lambda x: x["total_points"],
-        reverse=True
+    if league_ids:
+        return {"id": {"$in": league_ids}}
+    # Get all leagues between start and end date
+    start_date, end_date = _season_window(season)
+    return {"start_date": {"$gte": start_date}, "end_date": {"$lte": end_date}}
+
+def league_in_season(league: dict, season: dict) -> bool:
+    """Python twin of season_league_match for a single league document."""
+    league_ids = season.get("weeks", [])
+    if league_ids:
+        return league.get("id") in league_ids
+    start_date, end_date = _season_window(season)
+    return (
+        isinstance(league.get("start_date"), str) and isinstance(league.get("end_date"), str)
+        and league["start_date"] >= start_date and league["end_date"] <= end_date
     )
-    
-    # Add ranks and badges
-    badges_awarded = []
-    for idx, standing in enumerate(final_standings[:3]):
-        standing["rank"] = idx + 1
-        
-        # Award profile star badge to top 3
-        await db.users.update_one(
-            {"id": standing["user_id"]},
-            {"$set": {"profile_star": True}}
+
+async def compute_season_totals(season: dict) -> List[dict]:
+    """Sum league points per student across the season with one aggregation."""
+    pipeline = [
+        {"$match": season_league_match(season)},
+        {"$unwind": "$standings"},
+        {"$group": {
+            "_id": "$standings.user_id",
+            "username": {"$first": "$standings.username"},
+            "class_name": {"$last": "$standings.class_name"},
+            "institution_id": {"$last": "$standings.institution_id"},
+            "total_points": {"$sum": {"$ifNull": ["$standings.points", 0]}},
+            "weeks_participated": {"$sum": 1}
+        }},
+        {"$sort": {"total_points": -1, "_id": 1}},
+        {"$project": {
+            "_id": 0,
+            "user_id": "$_id",
+            "username": 1,
+            "class_name": 1,
+            "institution_id": 1,
+            "total_points": 1,
+            "weeks_participated": 1
+        }}
+    ]
+    return await db.leagues.aggregate(pipeline).to_list(None)
+
+async def finalize_season(season_id: str):
+    """Finalize season and award prizes to top 3.
+
+    Resumable: the computed standings are stored on the season together with
+    ``status="finalizing"`` before any user is touched, and every user update
+    is guarded by the season id in ``season_history``, so re-running after a
+    crash completes the awards without granting them twice.
+    """
+    season = await db.seasons.find_one({"id": season_id}, {"_id": 0})
+    if not season or season["status"] not in ("active", "finalizing"):
+        return
+
+    if season["status"] == "active":
+        final_standings = await compute_season_totals(season)
+        for idx, standing in enumerate(final_standings):
+            standing["rank"] = idx + 1
+            if idx < len(SEASON_XP_BONUSES):
+                standing["badge"] = SEASON_BADGES[idx]
+                standing["xp_bonus"] = SEASON_XP_BONUSES[idx]
+            else:
+                standing["badge"] = None
+
+        # Claim the season; a concurrent finalizer loses here and leaves it alone
+        season = await db.seasons.find_one_and_update(
+            {"id": season_id, "status": "active"},
+            {"$set": {"status": "finalizing", "final_standings": final_standings}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
         )
-        
-        # Award XP bonus
-        xp_bonus = [500, 300, 100][idx]  # 1st: 500, 2nd: 300, 3rd: 100
-        user = await db.users.find_one({"id": standing["user_id"]})
-        if user:
-            new_xp = user.get("xp", 0) + xp_bonus
-            new_level = calculate_xp_from_level(new_xp)
-            await db.users.update_one(
-                {"id": standing["user_id"]},
-                {"$set": {"xp": new_xp, "level": new_level}}
-            )
-        
-        badges_awarded.append({
-            "rank": idx + 1,
-            "badge": "🌟" if idx == 0 else "⭐" if idx == 1 else "✨",
-            "xp_bonus": xp_bonus
-        })
-        
-        standing["badge"] = badges_awarded[idx]["badge"]
-        standing["xp_bonus"] = xp_bonus
-    
-    # Add ranks to all others
-    for idx in range(3, len(final_standings)):
-        final_standings[idx]["rank"] = idx + 1
-        final_standings[idx]["badge"] = None
-    
-    # Save season history to user profiles
+        if not season:
+            return
+
+    final_standings = season.get("final_standings", [])
+
+    operations = []
     for standing in final_standings:
-        user = await db.users.find_one({"id": standing["user_id"]})
-        if user:
-            season_history = user.get("season_history", [])
-            season_history.append({
+        update = {
+            "$push": {"season_history": {
+                "season_id": season_id,
                 "season_number": season["season_number"],
                 "year": season["year"],
                 "rank": standing["rank"],
                 "total_points": standing["total_points"],
                 "badge": standing.get("badge")
-            })
-            await db.users.update_one(
-                {"id": standing["user_id"]},
-                {"$set": {"season_history": season_history}}
-            )
-    
-    # Update season
+            }}
+        }
+        if standing.get("xp_bonus"):
+            # Award profile star badge and XP bonus to top 3
+            update["$set"] = {"profile_star": True}
+            update["$inc"] = {"xp": standing["xp_bonus"]}
+        operations.append(UpdateOne(
+            {"id": standing["user_id"], "season_history.season_id": {"$ne": season_id}},
+            update
+        ))
+
+    winner_ids = [s["user_id"] for s in final_standings if s.get("xp_bonus")]
+    if winner_ids:
+        # Same rule as calculate_xp_from_level, evaluated server-side after $inc
+        operations.append(UpdateMany(
+            {"id": {"$in": winner_ids}},
+            [{"$set": {"level": {"$add": [{"$floor": {"$divide": [{"$ifNull": ["$xp", 0]}, 100]}}, 1]}}}]
+        ))
+
+    if operations:
+        await db.users.bulk_write(operations, ordered=True)
+
     await db.seasons.update_one(
         {"id": season_id},
-        {"$set": {
-            "status": "completed",
-            "final_standings": final_standings
-        }}
+        {"$set": {"status": "completed"}}
     )
-    
+
     logger.info(f"Season {season['season_number']} finalized. Top 3: {[s['username'] for s in final_standings[:3]]}")
     return final_standings
 
+async def resume_season_finalizations():
+    """Finish seasons left in ``finalizing`` state by a crashed worker."""
+    async for season in db.seasons.find({"status": "finalizing"}, {"_id": 0, "id": 1}):
+        await finalize_season(season["id"])
+
 @api_router.get("/season/current")
 async def get_current_season_endpoint(current_user: dict = Depends(get_current_user)):
     """Get current active season"""
@@ -1674,44 +2406,111 @@ async def get_season_history(current_user: dict = Depends(get_current_user)):
         "profile_star": user.get("profile_star", False)
     }
 
-@api_router.get("/season/standings")
-async def get_season_standings(current_user: dict = Depends(get_current_user)):
-    """Get current season standings"""
-    season = await get_current_season()
-    
-    if season["status"] == "completed":
-        return {"standings": season.get("final_standings", [])}
-    
-    # Calculate current standings from all leagues in season
-    start_date = datetime.fromisoformat(season["start_date"].replace('Z', '+00:00'))
-    end_date = datetime.fromisoformat(season["end_date"].replace('Z', '+00:00'))
-    
-    leagues = await db.leagues.find({
-        "start_date": {"$gte": start_date.isoformat()},
-        "end_date": {"$lte": end_date.isoformat()}
-    }).to_list(100)
-    
-    student_totals = {}
-    for league in leagues:
-        for standing in league.get("standings", []):
-            user_id = standing["user_id"]
-            if user_id not in student_totals:
-                student_totals[user_id] = {
+# Season standings read model: one season_standings document per
+# (season_id, user_id), kept current by record_league_points.
+SEASON_TOP_CACHE_SIZE = 100
+_season_top_cache: TTLCache = TTLCache(maxsize=256, ttl=60)  # (season_id, *scope) -> ranked rows
+
+def _evict_season_cache(season_id: str):
+    for key in [k for k in list(_season_top_cache.keys()) if k[0] == season_id]:
+        _season_top_cache.pop(key, None)
+
+async def record_league_points(league: dict, old_standings: List[dict], new_standings: List[dict]):
+    """Apply the change between two league snapshots to the active season's totals.
+
+    Only leagues that compute_season_totals would count for the season are
+    applied, so the read model and the final awards rank the same points.
+    """
+    season = await db.seasons.find_one(
+        {"status": "active"}, {"_id": 0, "id": 1, "start_date": 1, "end_date": 1, "weeks": 1}
+    )
+    if not season or not league_in_season(league, season):
+        return
+
+    previous_points = {s["user_id"]: s.get("points", 0) for s in old_standings}
+    operations = []
+    for standing in new_standings:
+        user_id = standing["user_id"]
+        delta = standing.get("points", 0) - previous_points.get(user_id, 0)
+        if delta == 0 and user_id in previous_points:
+            continue
+        operations.append(UpdateOne(
+            {"season_id": season["id"], "user_id": user_id},
+            {
+                "$inc": {"total_points": delta},
+                "$set": {
                     "username": standing["username"],
-                    "total_points": 0
+                    "class_name": standing.get("class_name"),
+                    "institution_id": standing.get("institution_id")
                 }
-            student_totals[user_id]["total_points"] += standing.get("points", 0)
-    
-    standings = sorted(
-        [{"user_id": uid, **data} for uid, data in student_totals.items()],
-        key=lambda x: x["total_points"],
-        reverse=True
-    )
-    
-    for idx, standing in enumerate(standings):
-        standing["rank"] = idx + 1
-    
-    return {"standings": standings}
+            },
+            upsert=True
+        ))
+    if operations:
+        await db.season_standings.bulk_write(operations, ordered=False)
+    _evict_season_cache(season["id"])
+
+async def materialize_season_standings(season: dict):
+    """Backfill season_standings from league snapshots for a season created before the read model."""
+    totals = await compute_season_totals(season)
+    if totals:
+        await db.season_standings.bulk_write([
+            UpdateOne(
+                {"season_id": season["id"], "user_id": t["user_id"]},
+                {"$set": {
+                    "username": t["username"],
+                    "class_name": t.get("class_name"),
+                    "institution_id": t.get("institution_id"),
+                    "total_points": t["total_points"]
+                }},
+                upsert=True
+            )
+            for t in totals
+        ], ordered=False)
+    await db.seasons.update_one({"id": season["id"]}, {"$set": {"standings_materialized": True}})
+    _evict_season_cache(season["id"])
+
+async def load_season_standings(
+    season: dict,
+    limit: int = SEASON_TOP_CACHE_SIZE,
+    scope: Optional[dict] = None
+) -> List[dict]:
+    """Top ``limit`` standings of a season, ranked within ``scope``, from the read model."""
+    scope = scope or {}
+    if season["status"] == "completed":
+        # Final standings keep their official (global) rank
+        final = season.get("final_standings", [])
+        return [s for s in final if all(s.get(k) == v for k, v in scope.items())][:limit]
+
+    season_id = season["id"]
+    cache_key = (season_id, *sorted(scope.items()))
+    standings = _season_top_cache.get(cache_key)
+    if standings is None:
+        if not season.get("standings_materialized"):
+            await single_flight(
+                f"season_standings:{season_id}",
+                lambda: materialize_season_standings(season)
+            )
+        rows = await db.season_standings.find(
+            {"season_id": season_id, **scope},
+            {"_id": 0, "user_id": 1, "username": 1, "class_name": 1, "total_points": 1}
+        ).sort([("total_points", -1), ("user_id", 1)]).limit(SEASON_TOP_CACHE_SIZE).to_list(SEASON_TOP_CACHE_SIZE)
+        standings = [{**row, "rank": idx + 1} for idx, row in enumerate(rows)]
+        _season_top_cache[cache_key] = standings
+    return standings[:limit]
+
+@api_router.get("/season/standings")
+async def get_season_standings(
+    limit: int = SEASON_TOP_CACHE_SIZE,
+    class_name: Optional[str] = None,
+    institution_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get current season standings, optionally for one class or institution"""
+    season = await get_current_season()
+    limit = min(max(limit, 1), SEASON_TOP_CACHE_SIZE)
+    scope = leaderboard_scope(class_name, institution_id)
+    return {"standings": await load_season_standings(season, limit, scope)}
 
 # ============= WEEKLY QUIZ =============
 
@@ -1747,70 +2546,86 @@ async def create_weekly_quiz(week_start: str, week_end: str) -> dict:
         week_end=week_end,
         questions=questions
     )
-    quiz_data = quiz.model_dump()
-    await db.weekly_quizzes.insert_one(quiz_data)
-    return quiz_data
+    # Unique on week_start: a concurrent creator's quiz wins and is returned instead
+    return await get_or_create(db.weekly_quizzes, {"week_start": week_start}, quiz.model_dump())
+
+# The week's quiz plus both student views, keyed by week_start. A quiz never
+# changes once created, the TTL only bounds how long an old week lingers.
+_weekly_quiz_cache: TTLCache = TTLCache(maxsize=4, ttl=3600)
+
+async def get_weekly_quiz_bundle(week_start: str, week_end: str) -> dict:
+    """Return ``{"quiz", "student_view", "review_view"}`` for the week, creating the quiz if needed."""
+    bundle = _weekly_quiz_cache.get(week_start)
+    if bundle is None:
+        bundle = await single_flight(
+            f"weekly_quiz:{week_start}",
+            lambda: _load_weekly_quiz_bundle(week_start, week_end)
+        )
+    return bundle
+
+async def _load_weekly_quiz_bundle(week_start: str, week_end: str) -> dict:
+    quiz = await db.weekly_quizzes.find_one({"week_start": week_start}, {"_id": 0})
+    if not quiz:
+        quiz = await create_weekly_quiz(week_start, week_end)
+    return _cache_weekly_quiz(quiz)
+
+def _cache_weekly_quiz(quiz: dict) -> dict:
+    bundle = {
+        "quiz": quiz,
+        "student_view": sanitize_quiz_for_student(quiz),
+        "review_view": sanitize_quiz_for_student(quiz, include_answers=True)
+    }
+    _weekly_quiz_cache[quiz["week_start"]] = bundle
+    return bundle
+
+async def get_weekly_quiz_bundle_by_id(quiz_id: str) -> Optional[dict]:
+    """Bundle for an existing quiz id, from the cache or Mongo; never creates a quiz."""
+    for bundle in list(_weekly_quiz_cache.values()):
+        if bundle["quiz"]["id"] == quiz_id:
+            return bundle
+    quiz = await db.weekly_quizzes.find_one({"id": quiz_id}, {"_id": 0})
+    return _cache_weekly_quiz(quiz) if quiz else None
 
 @api_router.get("/quizzes/weekly")
 async def get_weekly_quiz(current_user: dict = Depends(get_current_user)):
     week_start, week_end = get_week_range()
-    quiz = await db.weekly_quizzes.find_one({"week_start": week_start})
-    if not quiz:
-        try:
-            quiz = await create_weekly_quiz(week_start, week_end)
-        except ValueError as exc:
-            raise HTTPException(status_code=400, detail=str(exc))
+    try:
+        bundle = await get_weekly_quiz_bundle(week_start, week_end)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
     
+    # Only per-user query; on the (quiz_id, user_id) index a student who has
+    # not submitted yet is answered from the index without touching documents
     result = await db.weekly_quiz_results.find_one(
-        {"quiz_id": quiz["id"], "user_id": current_user["id"]},
+        {"quiz_id": bundle["quiz"]["id"], "user_id": current_user["id"]},
         {"_id": 0}
     )
     
-    sanitized_quiz = sanitize_quiz_for_student(quiz, include_answers=result is not None)
+    quiz = bundle["quiz"]
+    if result is not None:
+        result = localize_quiz_result(result, quiz, current_user["id"])
     
     return {
-        "quiz": sanitized_quiz,
+        "quiz": apply_quiz_variant(
+            bundle["review_view"] if result is not None else bundle["student_view"],
+            current_user["id"]
+        ),
         "completed": result is not None,
         "result": result
     }
 
 @api_router.post("/quizzes/weekly/submit")
 async def submit_weekly_quiz(submission: WeeklyQuizSubmission, current_user: dict = Depends(get_current_user)):
-    quiz = await db.weekly_quizzes.find_one({"id": submission.quiz_id})
-    if not quiz:
+    bundle = await get_weekly_quiz_bundle_by_id(submission.quiz_id)
+    if not bundle:
         raise HTTPException(status_code=404, detail="Quiz bulunamadı")
-    
-    existing_result = await db.weekly_quiz_results.find_one({
-        "quiz_id": submission.quiz_id,
-        "user_id": current_user["id"]
-    })
-    if existing_result:
-        raise HTTPException(status_code=400, detail="Bu haftaki quiz zaten tamamlandı")
+    quiz = bundle["quiz"]
     
     question_map = {q["id"]: q for q in quiz.get("questions", [])}
     if not question_map:
         raise HTTPException(status_code=400, detail="Quiz soruları eksik")
     
-    evaluated_answers = []
-    correct_count = 0
-    
-    for answer in submission.answers:
-        question_id = answer.get("question_id")
-        selected_option = answer.get("selected_option")
-        if question_id not in question_map or selected_option is None:
-            continue
-        
-        question = question_map[question_id]
-        is_correct = selected_option == question.get("correct_option_index")
-        if is_correct:
-            correct_count += 1
-        
-        evaluated_answers.append({
-            "question_id": question_id,
-            "selected_option": selected_option,
-            "correct_option_index": question.get("correct_option_index"),
-            "is_correct": is_correct
-        })
+    evaluated_answers, correct_count = grade_quiz_answers(quiz, current_user["id"], submission.answers)
     
     total_questions = len(question_map)
     if len(evaluated_answers) != total_questions:
@@ -1829,8 +2644,12 @@ async def submit_weekly_quiz(submission: WeeklyQuizSubmission, current_user: dic
     )
     
     result_data = result.model_dump()
-    await db.weekly_quiz_results.insert_one(result_data)
-    
+    try:
+        # Unique (quiz_id, user_id) index: a double submit fails here before any points are awarded
+        await db.weekly_quiz_results.insert_one(result_data)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Bu haftaki quiz zaten tamamlandı")
+    # Points right after the result: a retry is blocked by the unique index from here on
     await db.users.update_one(
         {"id": current_user["id"]},
         {
@@ -1838,20 +2657,227 @@ async def submit_weekly_quiz(submission: WeeklyQuizSubmission, current_user: dic
             "$inc": {"points": correct_count * 5}
         }
     )
-    
-    sanitized_quiz = sanitize_quiz_for_student(quiz, include_answers=True)
+
+    # Derived rollups last; both are best effort
+    await record_daily_activity(current_user["id"], datetime.now(timezone.utc), quizzes_completed=1)
+    if (
+        current_user.get("role") == "student"
+        and total_questions
+        and correct_count / total_questions < STRUGGLING_ACCURACY
+    ):
+        await flag_struggling_student(current_user, correct_count / total_questions, datetime.now(timezone.utc))
     
     return {
         "message": "Quiz sonuçların kaydedildi",
         "score": score,
         "correct_answers": correct_count,
         "total_questions": total_questions,
-        "quiz": sanitized_quiz,
-        "result": {k: v for k, v in result_data.items() if k != "_id"}
+        "quiz": apply_quiz_variant(bundle["review_view"], current_user["id"]),
+        "result": localize_quiz_result(
+            {k: v for k, v in result_data.items() if k != "_id"}, quiz, current_user["id"]
+        )
+    }
+
+# Item analysis of closed weeks never changes, keep it per quiz
+_quiz_analysis_cache: TTLCache = TTLCache(maxsize=128, ttl=24 * 3600)
+
+def _point_biserial(stats: dict) -> Optional[float]:
+    """Correlation between answering an item correctly and the total quiz score."""
+    n = stats["attempts"]
+    n1 = stats["correct"]
+    n0 = n - n1
+    if not n or not n1 or not n0:
+        return None
+    mean = stats["score_sum"] / n
+    variance = stats["score_sq_sum"] / n - mean ** 2
+    if variance <= 0:
+        return None
+    mean_correct = stats["correct_score_sum"] / n1
+    mean_wrong = (stats["score_sum"] - stats["correct_score_sum"]) / n0
+    return round((mean_correct - mean_wrong) / variance ** 0.5 * (n1 * n0 / n ** 2) ** 0.5, 3)
+
+@api_router.get("/teacher/quizzes/{quiz_id}/analysis")
+async def get_quiz_item_analysis(quiz_id: str, current_user: dict = Depends(require_role("teacher", "admin"))):
+    """Per-question difficulty, distractor shares and discrimination for a weekly quiz."""
+    cached = _quiz_analysis_cache.get(quiz_id)
+    if cached is not None:
+        return cached
+
+    bundle = await get_weekly_quiz_bundle_by_id(quiz_id)
+    if not bundle:
+        raise HTTPException(status_code=404, detail="Quiz bulunamadı")
+    quiz = bundle["quiz"]
+
+    # One pass over the results: per (question, option) first, then per question
+    pipeline = [
+        {"$match": {"quiz_id": quiz_id}},
+        {"$unwind": "$answers"},
+        {"$group": {
+            "_id": {"question_id": "$answers.question_id", "option": "$answers.selected_option"},
+            "count": {"$sum": 1},
+            "correct": {"$sum": {"$cond": ["$answers.is_correct", 1, 0]}},
+            "score_sum": {"$sum": "$score"},
+            "score_sq_sum": {"$sum": {"$multiply": ["$score", "$score"]}},
+            "correct_score_sum": {"$sum": {"$cond": ["$answers.is_correct", "$score", 0]}}
+        }},
+        {"$group": {
+            "_id": "$_id.question_id",
+            "attempts": {"$sum": "$count"},
+            "correct": {"$sum": "$correct"},
+            "score_sum": {"$sum": "$score_sum"},
+            "score_sq_sum": {"$sum": "$score_sq_sum"},
+            "correct_score_sum": {"$sum": "$correct_score_sum"},
+            "options": {"$push": {"option": "$_id.option", "count": "$count"}}
+        }}
+    ]
+    item_stats = {row["_id"]: row for row in await db.weekly_quiz_results.aggregate(pipeline).to_list(None)}
+
+    items = []
+    respondents = 0
+    for question in quiz.get("questions", []):
+        stats = item_stats.get(question["id"])
+        attempts = stats["attempts"] if stats else 0
+        respondents = max(respondents, attempts)
+        option_counts = {o["option"]: o["count"] for o in stats["options"]} if stats else {}
+        correct_index = question.get("correct_option_index")
+        options = []
+        for index, text in enumerate(question.get("options", [])):
+            count = option_counts.get(index, 0)
+            options.append({
+                "index": index,
+                "text": text,
+                "is_correct": index == correct_index,
+                "count": count,
+                # Share of all answers; for distractors this is their attractiveness
+                "share": round(count / attempts * 100, 1) if attempts else None
+            })
+        items.append({
+            "question_id": question["id"],
+            "prompt": question.get("prompt"),
+            "word_id": question.get("word_id"),
+            "attempts": attempts,
+            "difficulty": round(stats["correct"] / attempts * 100, 1) if attempts else None,
+            "discrimination": _point_biserial(stats) if stats else None,
+            "options": options
+        })
+
+    analysis = {
+        "quiz_id": quiz_id,
+        "week_start": quiz.get("week_start"),
+        "week_end": quiz.get("week_end"),
+        "respondents": respondents,
+        "items": items,
+        "generated_at": datetime.now(timezone.utc).isoformat()
     }
 
+    week_end = _parse_iso_datetime(quiz.get("week_end"))
+    if week_end and datetime.now(timezone.utc) >= week_end:
+        _quiz_analysis_cache[quiz_id] = analysis
+    return analysis
+
 # ============= TEACHER PANEL =============
 
+async def teacher_student_filter(current_user: dict) -> dict:
+    """Students visible to the caller: admins see everyone, teachers their own tenant."""
+    student_filter: Dict[str, Any] = {"role": "student"}
+    if current_user.get("role") == "admin":
+        return student_filter
+
+    institution_id = current_user.get("institution_id")
+    student_filter["institution_id"] = institution_id
+    owned_by_caller = [{"teacher_id": current_user["id"]}, {"created_by": current_user["id"]}]
+    owned_classes = await db.classes.distinct("name", {"$or": owned_by_caller})
+    if not owned_classes:
+        return student_filter
+
+    # Students created before institutions were stamped on them (see
+    # backfill_student_institutions) are only attributable through a class
+    # name no other tenant uses; the rest stay hidden until an admin resolves them
+    shared_filter: Dict[str, Any] = {"name": {"$in": owned_classes}, "$nor": owned_by_caller}
+    if institution_id is not None:
+        shared_filter["institution_id"] = {"$ne": institution_id}
+    shared_classes = set(await db.classes.distinct("name", shared_filter))
+    legacy_classes = [name for name in owned_classes if name not in shared_classes]
+
+    if institution_id is None:
+        student_filter["class_name"] = {"$in": legacy_classes}
+        return student_filter
+    student_filter.pop("institution_id")
+    student_filter["$or"] = [
+        {"institution_id": institution_id, "class_name": {"$in": owned_classes}},
+        {"institution_id": None, "class_name": {"$in": legacy_classes}},
+    ]
+    return student_filter
+
+
+async def backfill_student_institutions(teacher_id: Optional[str] = None):
+    """Copy institution_id/institution_name onto classes and students that predate tenant scoping.
+
+    Classes without an institution inherit their owning teacher's; students
+    without one inherit their class's. ``teacher_id`` limits the run to one
+    teacher's classes (used when a teacher joins an institution).
+    """
+    teacher_filter: Dict[str, Any] = {"role": "teacher", "institution_id": {"$ne": None}}
+    if teacher_id:
+        teacher_filter["id"] = teacher_id
+    async for teacher in db.users.find(teacher_filter, {"_id": 0, "id": 1, "institution_id": 1, "institution_name": 1}):
+        await db.classes.update_many(
+            {
+                "institution_id": None,
+                "$or": [{"teacher_id": teacher["id"]}, {"created_by": teacher["id"]}]
+            },
+            {"$set": {"institution_id": teacher["institution_id"], "institution_name": teacher.get("institution_name")}}
+        )
+
+    class_filter: Dict[str, Any] = {"institution_id": {"$ne": None}}
+    if teacher_id:
+        class_filter["$or"] = [{"teacher_id": teacher_id}, {"created_by": teacher_id}]
+    institutions_by_class: Dict[str, set] = defaultdict(set)
+    names: Dict[str, Optional[str]] = {}
+    async for classroom in db.classes.find(class_filter, {"_id": 0, "name": 1, "institution_id": 1, "institution_name": 1}):
+        institutions_by_class[classroom["name"]].add(classroom["institution_id"])
+        names[classroom["institution_id"]] = classroom.get("institution_name")
+
+    ambiguous = sorted(name for name, institution_ids in institutions_by_class.items() if len(institution_ids) > 1)
+    if ambiguous:
+        logger.warning(f"Institution backfill skipped classes shared by several institutions: {ambiguous}")
+
+    operations = [
+        UpdateMany(
+            {"role": "student", "class_name": class_name, "institution_id": None},
+            {"$set": {"institution_id": institution_id, "institution_name": names.get(institution_id)}}
+        )
+        for class_name, institution_ids in institutions_by_class.items()
+        # A class name used by several institutions cannot be attributed
+        if len(institution_ids) == 1
+        for institution_id in institution_ids
+    ]
+    if operations:
+        result = await db.users.bulk_write(operations, ordered=False)
+        logger.info(f"Institution backfill updated {result.modified_count} students")
+
+
+@api_router.post("/admin/maintenance/backfill-student-institutions")
+async def run_student_institution_backfill(current_user: dict = Depends(require_role("admin"))):
+    await single_flight("backfill_student_institutions", backfill_student_institutions)
+    return {"message": "Öğrenci kurum bilgileri güncellendi."}
+
+
+async def scoped_student_filter(current_user: dict, field: str, value: str) -> dict:
+    """teacher_student_filter narrowed to ``field == value``; never widens the teacher's partition."""
+    teacher_scope = await teacher_student_filter(current_user)
+    if field in teacher_scope:
+        return {"$and": [teacher_scope, {field: value}]}
+    return {**teacher_scope, field: value}
+
+
+async def teacher_roster_ids(current_user: dict, student_filter: Optional[dict] = None) -> Optional[List[str]]:
+    """User ids behind teacher_student_filter; None means unscoped (admin)."""
+    if current_user.get("role") == "admin":
+        return None
+    return await db.users.distinct("id", student_filter or await teacher_student_filter(current_user))
+
+
 @api_router.post("/teacher/classes")
 async def create_teacher_class(
     class_data: ClassCreate,
@@ -1868,7 +2894,11 @@ async def create_teacher_class(
     classroom = Classroom(
         name=name,
         description=class_data.description.strip() if class_data.description else None,
-        created_by=current_user["id"]
+        created_by=current_user["id"],
+        institution_id=current_user.get("institution_id"),
+        institution_name=current_user.get("institution_name"),
+        teacher_id=current_user["id"] if current_user.get("role") == "teacher" else None,
+        teacher_name=current_user["username"] if current_user.get("role") == "teacher" else None
     )
     await db.classes.insert_one(classroom.model_dump())
 
@@ -1882,17 +2912,18 @@ async def create_teacher_class(
 @api_router.get("/teacher/classes")
 async def get_teacher_classes(current_user: dict = Depends(require_role("teacher", "admin"))):
 
-    classes_cursor = db.classes.find({}, {"_id": 0})
-    classes: List[dict] = []
-    async for classroom in classes_cursor:
-        class_copy = classroom.copy()
-        class_copy.pop("created_by", None)
-        student_count = await db.users.count_documents({
-            "role": "student",
-            "class_name": classroom.get("name")
-        })
-        class_copy["student_count"] = student_count
-        classes.append(class_copy)
+    classes = await db.classes.find({}, {"_id": 0, "created_by": 0}).to_list(None)
+
+    # All class sizes in one pass, served by the (role, class_name, ...) index
+    student_counts = {
+        row["_id"]: row["count"]
+        for row in await db.users.aggregate([
+            {"$match": {"role": "student", "class_name": {"$in": [c.get("name") for c in classes]}}},
+            {"$group": {"_id": "$class_name", "count": {"$sum": 1}}}
+        ]).to_list(None)
+    }
+    for class_copy in classes:
+        class_copy["student_count"] = student_counts.get(class_copy.get("name"), 0)
 
     classes.sort(key=lambda cls: cls.get("name", "").lower())
     return classes
@@ -1924,7 +2955,9 @@ async def create_teacher_student(
         username=username,
         password=hash_password(student_data.password),
         role="student",
-        class_name=class_name
+        class_name=class_name,
+        institution_id=current_user.get("institution_id"),
+        institution_name=current_user.get("institution_name")
     )
     await db.users.insert_one(user.model_dump())
 
@@ -1938,7 +2971,7 @@ async def create_teacher_student(
 async def get_teacher_students(current_user: dict = Depends(require_role("teacher", "admin"))):
     
     students = await db.users.find(
-        {"role": "student"},
+        await teacher_student_filter(current_user),
         {"_id": 0, "password": 0}
     ).to_list(1000)
     
@@ -2038,12 +3071,18 @@ async def delete_teacher_word(
 @api_router.get("/teacher/statistics")
 async def get_teacher_statistics(current_user: dict = Depends(require_role("teacher", "admin"))):
     
-    total_students = await db.users.count_documents({"role": "student"})
+    roster_ids = await teacher_roster_ids(current_user)
+    game_filter = {} if roster_ids is None else {"user_id": {"$in": roster_ids}}
+
+    total_students = (
+        await db.users.count_documents({"role": "student"}) if roster_ids is None else len(roster_ids)
+    )
     total_words = await db.words.count_documents({})
-    total_games = await db.game_scores.count_documents({})
+    total_games = await db.game_scores.count_documents(game_filter)
     
     # Most difficult words (most wrong answers)
     pipeline = [
+        {"$match": game_filter},
         {"$group": {"_id": "$game_type", "count": {"$sum": 1}}},
         {"$sort": {"count": -1}}
     ]
@@ -2057,25 +3096,18 @@ async def get_teacher_statistics(current_user: dict = Depends(require_role("teac
     }
 
 
-@api_router.get("/admin/system-report")
-async def get_admin_system_report(current_user: dict = Depends(require_role("admin"))):
-    now = datetime.now(timezone.utc)
-    start_of_day = datetime(now.year, now.month, now.day, tzinfo=timezone.utc)
-    start_of_week = start_of_day - timedelta(days=start_of_day.weekday())
-    active_threshold = now - timedelta(minutes=30)
+# Several admins refreshing the dashboard share one report build
+ADMIN_REPORT_TTL_SECONDS = 30
+_admin_report_cache: TTLCache = TTLCache(maxsize=1, ttl=ADMIN_REPORT_TTL_SECONDS)
 
-    start_day_iso = start_of_day.isoformat()
-    start_week_iso = start_of_week.isoformat()
-    active_iso = active_threshold.isoformat()
-
-    total_teachers = await db.users.count_documents({"role": "teacher"})
-    total_students = await db.users.count_documents({"role": "student"})
-    new_today = await db.users.count_documents({"created_at": {"$gte": start_day_iso}})
-    new_week = await db.users.count_documents({"created_at": {"$gte": start_week_iso}})
-    active_users = await db.users.count_documents({"last_activity": {"$gte": active_iso}})
-
-    total_words = await db.words.count_documents({"$or": [{"approved": True}, {"approved": {"$exists": False}}]})
+async def _timed(section: str, coro: Awaitable[Any], timings: Dict[str, float]) -> Any:
+    started = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        timings[section] = round((time.perf_counter() - started) * 1000, 1)
 
+async def _report_popular_words() -> List[dict]:
     popular_pipeline = [
         {"$match": {"role": "student"}},
         {"$project": {"word_errors": {"$objectToArray": "$word_errors"}}},
@@ -2087,43 +3119,84 @@ async def get_admin_system_report(current_user: dict = Depends(require_role("adm
     popular_words = await db.users.aggregate(popular_pipeline).to_list(5)
     if not popular_words:
         sample_words = await db.words.find({}, {"_id": 0, "id": 1, "english": 1, "turkish": 1}).limit(5).to_list(5)
-        popular_words = [
+        return [
             {"_id": w["id"], "count": 0, "turkish": w.get("turkish"), "english": w.get("english")}
             for w in sample_words
         ]
-    else:
-        word_map = {
-            w["id"]: w
-            for w in await db.words.find({}, {"_id": 0, "id": 1, "english": 1, "turkish": 1}).to_list(1000)
-        }
-        for item in popular_words:
-            word_info = word_map.get(item["_id"])
-            if word_info:
-                item["turkish"] = word_info.get("turkish")
-                item["english"] = word_info.get("english")
-
-    games_window = now - timedelta(days=6)
-    scores = await db.game_scores.find({"created_at": {"$gte": games_window.isoformat()}}, {"_id": 0, "created_at": 1}).to_list(5000)
-    daily_games_map: Dict[str, int] = defaultdict(int)
-    for score in scores:
-        created_at = score.get("created_at")
-        if created_at:
-            try:
-                date_key = datetime.fromisoformat(created_at.replace("Z", "+00:00")).date().isoformat()
-            except Exception:
-                date_key = created_at[:10]
-            daily_games_map[date_key] += 1
+    word_map = {
+        w["id"]: w
+        for w in await db.words.find(
+            {"id": {"$in": [item["_id"] for item in popular_words]}},
+            {"_id": 0, "id": 1, "english": 1, "turkish": 1}
+        ).to_list(len(popular_words))
+    }
+    for item in popular_words:
+        word_info = word_map.get(item["_id"])
+        if word_info:
+            item["turkish"] = word_info.get("turkish")
+            item["english"] = word_info.get("english")
+    return popular_words
+
+async def _report_daily_games(games_window: datetime) -> List[dict]:
+    daily_games_rows = await db.user_daily_activity.aggregate([
+        {"$match": {"date": {"$gte": games_window.date().isoformat()}}},
+        {"$group": {"_id": "$date", "count": {"$sum": "$games_played"}}}
+    ]).to_list(None)
+    daily_games_map = {row["_id"]: row["count"] for row in daily_games_rows}
     daily_games = []
     for i in range(7):
         day = (games_window + timedelta(days=i)).date().isoformat()
         daily_games.append({"date": day, "count": daily_games_map.get(day, 0)})
+    return daily_games
 
-    league = await db.leagues.find_one(sort=[("year", -1), ("week_number", -1)])
-    top_league = []
-    if league:
-        top_league = league.get("standings", [])[:5]
+async def _report_league_top() -> List[dict]:
+    league = await db.leagues.find_one(
+        sort=[("year", -1), ("week_number", -1)],
+        projection={"_id": 0, "standings": {"$slice": 5}}
+    )
+    return league.get("standings", [])[:5] if league else []
+
+async def build_admin_system_report() -> dict:
+    now = datetime.now(timezone.utc)
+    start_of_day = datetime(now.year, now.month, now.day, tzinfo=timezone.utc)
+    start_of_week = start_of_day - timedelta(days=start_of_day.weekday())
+    active_threshold = now - timedelta(minutes=30)
 
-    report = {
+    start_day_iso = start_of_day.isoformat()
+    start_week_iso = start_of_week.isoformat()
+    active_iso = active_threshold.isoformat()
+
+    # All sections are independent: run them concurrently and time each one
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    (
+        total_teachers,
+        total_students,
+        new_today,
+        new_week,
+        active_users,
+        total_words,
+        popular_words,
+        daily_games,
+        top_league
+    ) = await asyncio.gather(
+        _timed("total_teachers", db.users.count_documents({"role": "teacher"}), timings),
+        _timed("total_students", db.users.count_documents({"role": "student"}), timings),
+        _timed("new_today", db.users.count_documents({"created_at": {"$gte": start_day_iso}}), timings),
+        _timed("new_this_week", db.users.count_documents({"created_at": {"$gte": start_week_iso}}), timings),
+        _timed("active_now", db.users.count_documents({"last_activity": {"$gte": active_iso}}), timings),
+        _timed(
+            "total_words",
+            db.words.count_documents({"$or": [{"approved": True}, {"approved": {"$exists": False}}]}),
+            timings
+        ),
+        _timed("popular_words", _report_popular_words(), timings),
+        _timed("daily_games", _report_daily_games(now - timedelta(days=6)), timings),
+        _timed("league_top", _report_league_top(), timings)
+    )
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+
+    return {
         "generated_at": now.isoformat(),
         "users": {
             "total_teachers": total_teachers,
@@ -2139,8 +3212,20 @@ async def get_admin_system_report(current_user: dict = Depends(require_role("adm
         "activity": {
             "daily_games": daily_games,
             "league_top": top_league
-        }
+        },
+        "timings_ms": timings
     }
+
+async def _refresh_admin_system_report() -> dict:
+    report = await build_admin_system_report()
+    _admin_report_cache["report"] = report
+    return report
+
+@api_router.get("/admin/system-report")
+async def get_admin_system_report(current_user: dict = Depends(require_role("admin"))):
+    report = _admin_report_cache.get("report")
+    if report is None:
+        report = await single_flight("admin_system_report", _refresh_admin_system_report)
     return report
 
 
@@ -2169,23 +3254,55 @@ async def create_institution(
     return {"message": "Kurum oluşturuldu.", "institution": payload}
 
 
+async def count_institution_members(institution_ids: List[str]) -> Dict[str, Dict[str, int]]:
+    """Teacher and student counts per institution: ``{id: {"teacher": n, "student": m}}``.
+
+    Shared by the institutions overview and the quota checks.
+    """
+    counts: Dict[str, Dict[str, int]] = {inst_id: {"teacher": 0, "student": 0} for inst_id in institution_ids}
+    if not institution_ids:
+        return counts
+    rows = await db.users.aggregate([
+        {"$match": {"role": {"$in": ["teacher", "student"]}, "institution_id": {"$in": institution_ids}}},
+        {"$group": {"_id": {"institution_id": "$institution_id", "role": "$role"}, "count": {"$sum": 1}}}
+    ]).to_list(None)
+    for row in rows:
+        counts[row["_id"]["institution_id"]][row["_id"]["role"]] = row["count"]
+    return counts
+
 @api_router.get("/admin/institutions")
-async def get_institutions(current_user: dict = Depends(require_role("admin"))):
-    institutions = await db.institutions.find({}, {"_id": 0}).sort("name", 1).to_list(200)
+async def get_institutions(
+    page: int = 1,
+    page_size: int = 200,
+    current_user: dict = Depends(require_role("admin"))
+):
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), 200)
+    total = await db.institutions.count_documents({})
+    institutions = await db.institutions.find({}, {"_id": 0}).sort("name", 1).skip(
+        (page - 1) * page_size
+    ).limit(page_size).to_list(page_size)
+    institution_ids = [inst["id"] for inst in institutions]
+
+    # Three queries for the whole page instead of three per institution
+    member_counts = await count_institution_members(institution_ids)
+    classes_by_institution: Dict[str, List[dict]] = defaultdict(list)
+    async for classroom in db.classes.find(
+        {"institution_id": {"$in": institution_ids}}, {"_id": 0}
+    ).sort([("institution_id", 1), ("name", 1)]):
+        classes_by_institution[classroom["institution_id"]].append(classroom)
+
     response = []
     for inst in institutions:
-        inst_id = inst["id"]
-        teacher_count = await db.users.count_documents({"role": "teacher", "institution_id": inst_id})
-        student_count = await db.users.count_documents({"role": "student", "institution_id": inst_id})
-        classes = await db.classes.find({"institution_id": inst_id}, {"_id": 0}).sort("name", 1).to_list(200)
+        classes = classes_by_institution.get(inst["id"], [])
         response.append({
             **inst,
-            "teacher_count": teacher_count,
-            "student_count": student_count,
+            "teacher_count": member_counts[inst["id"]]["teacher"],
+            "student_count": member_counts[inst["id"]]["student"],
             "class_count": len(classes),
             "classes": classes
         })
-    return {"institutions": response}
+    return {"institutions": response, "total": total, "page": page, "page_size": page_size}
 
 
 @api_router.post("/admin/institutions/{institution_id}/assign-teacher")
@@ -2202,14 +3319,16 @@ async def assign_teacher_to_institution(
     if not teacher or teacher.get("role") != "teacher":
         raise HTTPException(status_code=404, detail="Öğretmen bulunamadı.")
 
-    teacher_count = await db.users.count_documents({"role": "teacher", "institution_id": institution_id})
-    if teacher_count >= institution.get("teacher_limit", 5):
+    members = (await count_institution_members([institution_id]))[institution_id]
+    if members["teacher"] >= institution.get("teacher_limit", 5):
         raise HTTPException(status_code=400, detail="Bu kurum için öğretmen kotası dolu.")
 
     await db.users.update_one(
         {"id": assignment.teacher_id},
         {"$set": {"institution_id": institution_id, "institution_name": institution.get("name")}}
     )
+    # Bring the teacher's existing classes and students into the institution
+    await backfill_student_institutions(teacher_id=assignment.teacher_id)
 
     return {"message": f"{teacher['username']} kullanıcısı {institution['name']} kurumuna atandı."}
 
@@ -2356,52 +3475,132 @@ async def update_system_settings(
     new_settings = await get_system_settings()
     new_settings.pop("_id", None)
     return {"message": "Ayarlar güncellendi.", "settings": new_settings}
+SUMMARY_STUDENT_SORTS = {"username", "class_name", "points", "words_learned", "games_played", "streak", "last_login_date"}
+# Quiz sort keys and the quiz_summary_pipeline field they rank on
+SUMMARY_QUIZ_SORTS = {
+    "average_quiz_score": "average",
+    "best_quiz_score": "best",
+    "last_quiz_score": "last_score",
+    "last_quiz_submitted_at": "last_submitted_at",
+    "weekly_quiz_completion_count": "count"
+}
+SUMMARY_STUDENT_PROJECTION = {
+    "_id": 0, "id": 1, "username": 1, "class_name": 1, "points": 1,
+    "words_learned": 1, "games_played": 1, "streak": 1, "last_login_date": 1
+}
+
+def quiz_summary_pipeline(match: dict) -> List[dict]:
+    """Per-student weekly quiz stats (count, average, best, last) in one grouping."""
+    return [
+        {"$match": match},
+        # (user_id, submitted_at) index order, so $first is each student's latest result
+        {"$sort": {"user_id": 1, "submitted_at": -1}},
+        {"$group": {
+            "_id": "$user_id",
+            "count": {"$sum": 1},
+            "average": {"$avg": "$score"},
+            "best": {"$max": "$score"},
+            "last_score": {"$first": "$score"},
+            "last_submitted_at": {"$first": "$submitted_at"}
+        }}
+    ]
+
+def _student_summary(student: dict, stats: Optional[dict]) -> dict:
+    return {
+        "id": student["id"],
+        "username": student["username"],
+        "class_name": student.get("class_name"),
+        "points": student.get("points", 0),
+        "words_learned": student.get("words_learned", 0),
+        "games_played": student.get("games_played", 0),
+        "streak": student.get("streak", 0),
+        "last_login_date": student.get("last_login_date"),
+        "average_quiz_score": round(stats["average"], 1) if stats and stats.get("average") is not None else None,
+        "best_quiz_score": stats.get("best") if stats else None,
+        "last_quiz_score": stats.get("last_score") if stats else None,
+        "last_quiz_submitted_at": stats.get("last_submitted_at") if stats else None,
+        "weekly_quiz_completion_count": stats["count"] if stats else 0
+    }
+
+def _summary_page(
+    students: List[dict], quiz_stats: Dict[str, dict], total: int, page: int, page_size: int, sort_by: str, order: str
+) -> dict:
+    return {
+        "students": [_student_summary(student, quiz_stats.get(student["id"])) for student in students],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "sort_by": sort_by,
+        "order": order
+    }
+
 @api_router.get("/teacher/students/summary")
-async def get_teacher_student_summary(current_user: dict = Depends(require_role("teacher", "admin"))):
-    
-    summaries = []
-    students_cursor = db.users.find(
-        {"role": "student"},
-        {"_id": 0, "password": 0}
-    )
-    
-    async for student in students_cursor:
-        quiz_results = await db.weekly_quiz_results.find(
-            {"user_id": student["id"]},
-            {"_id": 0}
-        ).sort("submitted_at", -1).to_list(20)
-        
-        completion_count = len(quiz_results)
-        average_score = None
-        best_score = None
-        last_quiz = quiz_results[0] if quiz_results else None
-        
-        if quiz_results:
-            total_score = sum(res.get("score", 0) for res in quiz_results)
-            average_score = total_score / completion_count if completion_count else None
-            best_score = max(res.get("score", 0) for res in quiz_results)
-        
-        summaries.append({
-            "id": student["id"],
-            "username": student["username"],
-            "class_name": student.get("class_name"),
-            "points": student.get("points", 0),
-            "words_learned": student.get("words_learned", 0),
-            "games_played": student.get("games_played", 0),
-            "streak": student.get("streak", 0),
-            "last_login_date": student.get("last_login_date"),
-            "average_quiz_score": round(average_score, 1) if average_score is not None else None,
-            "best_quiz_score": best_score,
-            "last_quiz_score": last_quiz.get("score") if last_quiz else None,
-            "last_quiz_submitted_at": last_quiz.get("submitted_at") if last_quiz else None,
-            "weekly_quiz_completion_count": completion_count
-        })
-    
-    summaries.sort(
-        key=lambda s: (s["average_quiz_score"] is None, -(s["average_quiz_score"] or 0))
-    )
-    
-    return {"students": summaries}
+async def get_teacher_student_summary(
+    page: int = 1,
+    page_size: int = 200,
+    sort_by: str = "average_quiz_score",
+    order: Literal["asc", "desc"] = "desc",
+    current_user: dict = Depends(require_role("teacher", "admin"))
+):
+    if sort_by not in SUMMARY_STUDENT_SORTS and sort_by not in SUMMARY_QUIZ_SORTS:
+        raise HTTPException(status_code=400, detail="Geçersiz sıralama alanı.")
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), 1000)
+    skip = (page - 1) * page_size
+
+    student_filter = await teacher_student_filter(current_user)
+    total = await db.users.count_documents(student_filter)
+    direction = -1 if order == "desc" else 1
+
+    if sort_by in SUMMARY_STUDENT_SORTS:
+        # Page in Mongo, then aggregate quiz stats for that page only
+        students = await db.users.find(student_filter, SUMMARY_STUDENT_PROJECTION).sort(
+            [(sort_by, direction), ("id", 1)]
+        ).skip(skip).limit(page_size).to_list(page_size)
+        quiz_stats = {
+            row["_id"]: row
+            for row in await db.weekly_quiz_results.aggregate(
+                quiz_summary_pipeline({"user_id": {"$in": [s["id"] for s in students]}})
+            ).to_list(None)
+        }
+        return _summary_page(students, quiz_stats, total, page, page_size, sort_by, order)
+
+    # Rank the quiz stats in Mongo and only load the page's students;
+    # students without quiz results come after every ranked one
+    roster_ids = await teacher_roster_ids(current_user, student_filter)
+    if roster_ids is None:
+        # Admins: everyone's results except the few non-student submitters
+        result_match = {"user_id": {"$nin": await db.users.distinct("id", {"role": {"$ne": "student"}})}}
+    else:
+        result_match = {"user_id": {"$in": roster_ids}}
+    [ranking] = await db.weekly_quiz_results.aggregate(
+        quiz_summary_pipeline(result_match) + [
+            {"$sort": {SUMMARY_QUIZ_SORTS[sort_by]: direction, "_id": 1}},
+            {"$facet": {
+                "ranked": [{"$count": "total"}],
+                "page": [{"$skip": skip}, {"$limit": page_size}]
+            }}
+        ],
+        allowDiskUse=True
+    ).to_list(1)
+    ranked_total = ranking["ranked"][0]["total"] if ranking["ranked"] else 0
+    quiz_stats = {row["_id"]: row for row in ranking["page"]}
+
+    students_by_id = {
+        student["id"]: student
+        for student in await db.users.find(
+            {"$and": [student_filter, {"id": {"$in": list(quiz_stats)}}]}, SUMMARY_STUDENT_PROJECTION
+        ).to_list(None)
+    }
+    students = [students_by_id[user_id] for user_id in quiz_stats if user_id in students_by_id]
+
+    remaining = page_size - len(quiz_stats)
+    if remaining > 0:
+        ranked_ids = await db.weekly_quiz_results.distinct("user_id", result_match)
+        students += await db.users.find(
+            {"$and": [student_filter, {"id": {"$nin": ranked_ids}}]}, SUMMARY_STUDENT_PROJECTION
+        ).sort([("username", 1), ("id", 1)]).skip(max(skip - ranked_total, 0)).limit(remaining).to_list(remaining)
+    return _summary_page(students, quiz_stats, total, page, page_size, sort_by, order)
 
 def _parse_iso_datetime(value: Optional[str]) -> Optional[datetime]:
     if not value:
@@ -2438,30 +3637,11 @@ async def get_teacher_student_profile(student_id: str, current_user: dict = Depe
     today = datetime.now(timezone.utc).date()
     start_date = today - timedelta(days=29)
 
-    daily_activity_map: Dict[str, Dict[str, int]] = {}
-
-    for score in game_history:
-        activity_date = _parse_iso_datetime(score.get("created_at"))
-        if not activity_date:
-            continue
-        activity_key = activity_date.date().isoformat()
-        if activity_date.date() < start_date or activity_date.date() > today:
-            continue
-        if activity_key not in daily_activity_map:
-            daily_activity_map[activity_key] = {"games_played": 0, "correct_answers": 0}
-        daily_activity_map[activity_key]["games_played"] += 1
-        daily_activity_map[activity_key]["correct_answers"] += score.get("correct_answers", 0)
-
-    for quiz in quiz_history:
-        activity_date = _parse_iso_datetime(quiz.get("submitted_at"))
-        if not activity_date:
-            continue
-        activity_key = activity_date.date().isoformat()
-        if activity_date.date() < start_date or activity_date.date() > today:
-            continue
-        if activity_key not in daily_activity_map:
-            daily_activity_map[activity_key] = {"games_played": 0, "correct_answers": 0}
-        daily_activity_map[activity_key]["quizzes_completed"] = daily_activity_map[activity_key].get("quizzes_completed", 0) + 1
+    rollup = await db.user_daily_activity.find(
+        {"user_id": student_id, "date": {"$gte": start_date.isoformat(), "$lte": today.isoformat()}},
+        {"_id": 0}
+    ).to_list(30)
+    daily_activity_map: Dict[str, dict] = {row["date"]: row for row in rollup}
 
     daily_activity = []
     for day_index in range(30):
@@ -2502,53 +3682,30 @@ async def get_teacher_class_activity(
     today = datetime.now(timezone.utc).date()
     start_date = today - timedelta(days=days - 1)
 
-    date_filter_start = datetime.combine(start_date, datetime.min.time(), tzinfo=timezone.utc).isoformat()
-    date_filter_end = datetime.combine(today, datetime.max.time(), tzinfo=timezone.utc).isoformat()
-
-    activity_map: Dict[str, set] = defaultdict(set)
-    class_student_ids: Optional[set[str]] = None
+    class_student_ids: Optional[List[str]] = None
 
     if class_name:
-        class_students_cursor = db.users.find(
+        class_students = await db.users.find(
             {"role": "student", "class_name": class_name},
             {"_id": 0, "id": 1}
-        )
-        class_student_ids = set()
-        async for student in class_students_cursor:
-            class_student_ids.add(student["id"])
+        ).to_list(None)
+        class_student_ids = [student["id"] for student in class_students]
 
         if not class_student_ids:
             return {
                 "heatmap": []
             }
 
-    game_scores = await db.game_scores.find(
-        {"created_at": {"$gte": date_filter_start, "$lte": date_filter_end}},
-        {"_id": 0, "user_id": 1, "created_at": 1}
-    ).to_list(5000)
-
-    for score in game_scores:
-        created_at = _parse_iso_datetime(score.get("created_at"))
-        if not created_at:
-            continue
-        user_id = score.get("user_id")
-        if class_student_ids is not None and user_id not in class_student_ids:
-            continue
-        activity_map[created_at.date().isoformat()].add(user_id)
-
-    quiz_results = await db.weekly_quiz_results.find(
-        {"submitted_at": {"$gte": date_filter_start, "$lte": date_filter_end}},
-        {"_id": 0, "user_id": 1, "submitted_at": 1}
-    ).to_list(5000)
-
-    for result in quiz_results:
-        submitted_at = _parse_iso_datetime(result.get("submitted_at"))
-        if not submitted_at:
-            continue
-        user_id = result.get("user_id")
-        if class_student_ids is not None and user_id not in class_student_ids:
-            continue
-        activity_map[submitted_at.date().isoformat()].add(user_id)
+    # Distinct active students per day, counted in Mongo over the rollup
+    activity_match: dict = {"date": {"$gte": start_date.isoformat(), "$lte": today.isoformat()}}
+    if class_student_ids is not None:
+        activity_match["user_id"] = {"$in": class_student_ids}
+    activity_rows = await db.user_daily_activity.aggregate([
+        {"$match": activity_match},
+        {"$group": {"_id": "$date", "users": {"$addToSet": "$user_id"}}},
+        {"$project": {"active_students": {"$size": "$users"}}}
+    ]).to_list(None)
+    active_by_day = {row["_id"]: row["active_students"] for row in activity_rows}
 
     if class_student_ids is not None:
         total_students = len(class_student_ids)
@@ -2558,7 +3715,7 @@ async def get_teacher_class_activity(
     heatmap = []
     for offset in range(days):
         day = start_date + timedelta(days=offset)
-        students_active = len(activity_map.get(day.isoformat(), set()))
+        students_active = active_by_day.get(day.isoformat(), 0)
         percent_active = round((students_active / total_students) * 100, 1) if total_students else 0
         heatmap.append({
             "date": day.isoformat(),
@@ -2569,51 +3726,47 @@ async def get_teacher_class_activity(
     return {"heatmap": heatmap, "total_students": total_students}
 
 @api_router.get("/teacher/dashboard/actions")
-async def get_teacher_dashboard_actions(current_user: dict = Depends(require_role("teacher", "admin"))):
+async def get_teacher_dashboard_actions(
+    current_user: dict = Depends(require_role("teacher", "admin")),
+    word_loader: WordLoader = Depends(get_word_loader)
+):
     now = datetime.now(timezone.utc)
-    struggling_cutoff = now - timedelta(days=1)
-    inactive_cutoff = now - timedelta(days=3)
+    struggling_cutoff = (now - STRUGGLING_WINDOW).isoformat()
+    inactive_cutoff = now - INACTIVE_AFTER
 
-    recent_results = await db.weekly_quiz_results.find(
-        {"submitted_at": {"$gte": struggling_cutoff.isoformat()}},
-        {"_id": 0}
-    ).to_list(1000)
+    # Precomputed per-class lists, same tenant partition as the roster
+    student_filter = await teacher_student_filter(current_user)
+    class_filter = {key: value for key, value in student_filter.items() if key != "role"}
+    class_actions = await db.class_actions.find(class_filter, {"_id": 0}).to_list(None)
 
-    struggling_ids = set()
-    for result in recent_results:
-        total_questions = result.get("total_questions") or 0
-        correct_answers = result.get("correct_answers") or 0
-        accuracy = (correct_answers / total_questions) if total_questions else 0
-        if accuracy < 0.5:
-            struggling_ids.add(result["user_id"])
+    struggling_students = []
+    word_error_aggregate: Dict[str, int] = defaultdict(int)
+    classes = []
+    for actions in class_actions:
+        flagged = [entry for entry in actions.get("struggling") or [] if entry["flagged_at"] >= struggling_cutoff]
+        struggling_students.extend({"id": entry["user_id"], "username": entry["username"]} for entry in flagged)
+        for word_id, count in (actions.get("word_errors") or {}).items():
+            word_error_aggregate[word_id] += count
+        classes.append({
+            "class_name": actions.get("class_name"),
+            "struggling_count": len(flagged),
+            "updated_at": actions.get("updated_at")
+        })
 
-    inactive_students_cursor = db.users.find(
+    # Served by the (institution_id, role, class_name, last_login_date) index
+    inactive_students = await db.users.find(
         {
-            "role": "student",
-            "$or": [
-                {"last_login_date": {"$lt": inactive_cutoff.isoformat()}},
-                {"last_login_date": {"$exists": False}}
+            "$and": [
+                student_filter,
+                {"$or": [
+                    {"last_login_date": {"$lt": inactive_cutoff.isoformat()}},
+                    {"last_login_date": {"$exists": False}}
+                ]}
             ]
         },
         {"_id": 0, "id": 1, "username": 1, "last_login_date": 1}
-    )
-    inactive_students = []
-    async for student in inactive_students_cursor:
-        inactive_students.append(student)
+    ).to_list(None)
 
-    struggling_students = []
-    if struggling_ids:
-        struggling_students = await db.users.find(
-            {"id": {"$in": list(struggling_ids)}},
-            {"_id": 0, "id": 1, "username": 1}
-        ).to_list(len(struggling_ids))
-
-    word_error_aggregate: Dict[str, int] = defaultdict(int)
-    students_cursor = db.users.find({"role": "student"}, {"_id": 0, "word_errors": 1})
-    async for student in students_cursor:
-        for word_id, count in (student.get("word_errors") or {}).items():
-            word_error_aggregate[word_id] += count
-    
     # Map aggregated word_ids back to word documents
     challenging_words: List[dict] = []
     if word_error_aggregate:
@@ -2622,8 +3775,7 @@ async def get_teacher_dashboard_actions(current_user: dict = Depends(require_rol
             key=lambda item: item[1],
             reverse=True
         )[:10]
-        word_ids = [word_id for word_id, _ in top_items]
-        words = await db.words.find({"id": {"$in": word_ids}}, {"_id": 0}).to_list(100)
+        words = await word_loader.load_many([word_id for word_id, _ in top_items])
         word_map = {w["id"]: w for w in words}
         for word_id, count in top_items:
             word = word_map.get(word_id)
@@ -2640,7 +3792,9 @@ async def get_teacher_dashboard_actions(current_user: dict = Depends(require_rol
     return {
         "struggling_students": struggling_students,
         "inactive_students": inactive_students,
-        "challenging_words": challenging_words
+        "challenging_words": challenging_words,
+        "classes": classes,
+        "updated_at": max((c["updated_at"] for c in classes if c["updated_at"]), default=None)
     }
 
 @api_router.post("/teacher/assignments")
@@ -2685,7 +3839,10 @@ async def list_word_assignments(current_user: dict = Depends(require_role("teach
 # ============= PERSONALIZED LEARNING PLAN =============
 
 @api_router.get("/learning/personalized-plan")
-async def get_personalized_learning_plan(current_user: dict = Depends(get_current_user)):
+async def get_personalized_learning_plan(
+    current_user: dict = Depends(get_current_user),
+    word_loader: WordLoader = Depends(get_word_loader)
+):
     """Generate personalized learning plan based on user errors"""
     user = await db.users.find_one({"id": current_user["id"]})
     if not user:
@@ -2704,21 +3861,17 @@ async def get_personalized_learning_plan(current_user: dict = Depends(get_curren
     weak_categories: List[str] = []
     
     if difficult_word_ids:
-        words_cursor = db.words.find({"id": {"$in": difficult_word_ids}}, {"_id": 0})
-        words = await words_cursor.to_list(100)
+        words = await word_loader.load_many(difficult_word_ids)
         study_words = [w["id"] for w in words][:12]
         weak_categories = list({w.get("category", "general") for w in words})
     else:
         # If no errors, get random words
         words = await db.words.find({}, {"_id": 0}).to_list(100)
+        word_loader.prime(words)
         study_words = random.sample([w["id"] for w in words], min(12, len(words)))
     
-    # Get word details
-    word_details = []
-    for word_id in study_words:
-        word = await db.words.find_one({"id": word_id}, {"_id": 0})
-        if word:
-            word_details.append(word)
+    # Get word details (already loaded above, served by the loader)
+    word_details = await word_loader.load_many(study_words)
     
     return {
         "weak_categories": weak_categories,
@@ -2731,14 +3884,45 @@ async def get_personalized_learning_plan(current_user: dict = Depends(get_curren
     }
 
 
+# Review queue: due cards most overdue first (harder cards first within a
+# day), topped up with at most NEW_CARDS_PER_DAY never-seen words per day.
+# Both reads are served by the (user_id, next_review, ease_factor) index.
+NEW_CARDS_PER_DAY = 10
+
+async def review_queue_counts(user_id: str, today_iso: str) -> Dict[str, int]:
+    """Pending due reviews and today's remaining new-card allowance (count-only queries)."""
+    due_count, introduced_today = await asyncio.gather(
+        db.user_word_progress.count_documents({"user_id": user_id, "next_review": {"$lte": today_iso}}),
+        db.user_word_progress.count_documents({"user_id": user_id, "introduced_on": today_iso})
+    )
+    return {"due_count": due_count, "new_available": max(NEW_CARDS_PER_DAY - introduced_today, 0)}
+
+async def _new_review_words(user_id: str, count: int) -> List[dict]:
+    """Sample ``count`` words the user has no progress for yet."""
+    if count <= 0:
+        return []
+    candidates = await db.words.aggregate([
+        {"$sample": {"size": count * 3}},
+        {"$project": {"_id": 0}}
+    ]).to_list(None)
+    seen = set(await db.user_word_progress.distinct(
+        "word_id", {"user_id": user_id, "word_id": {"$in": [w["id"] for w in candidates]}}
+    ))
+    return [word for word in candidates if word["id"] not in seen][:count]
+
 @api_router.get("/learning/review-words")
-async def get_review_words(limit: int = 20, current_user: dict = Depends(get_current_user)):
+async def get_review_words(
+    limit: int = 20,
+    current_user: dict = Depends(get_current_user),
+    word_loader: WordLoader = Depends(get_word_loader)
+):
     """
     Get words that are due for spaced repetition review for the current user.
-    If the user has no review history yet, fall back to random words.
+    Due cards come most overdue first; free slots are filled with new words
+    up to the daily new-card cap.
     """
-    today = datetime.now(timezone.utc).date()
-    today_iso = today.isoformat()
+    limit = min(max(limit, 1), 100)
+    today_iso = datetime.now(timezone.utc).date().isoformat()
     
     progress_docs = await db.user_word_progress.find(
         {
@@ -2746,17 +3930,10 @@ async def get_review_words(limit: int = 20, current_user: dict = Depends(get_cur
             "next_review": {"$lte": today_iso}
         },
         {"_id": 0}
-    ).to_list(limit)
-    
-    if not progress_docs:
-        # Initialize with random words
-        words = await db.words.find({}, {"_id": 0}).to_list(limit * 2)
-        random.shuffle(words)
-        selected = words[:limit]
-        return {"mode": "initial", "words": selected}
+    ).sort([("next_review", 1), ("ease_factor", 1)]).to_list(limit)
+    counts = await review_queue_counts(current_user["id"], today_iso)
     
-    word_ids = [p["word_id"] for p in progress_docs]
-    words = await db.words.find({"id": {"$in": word_ids}}, {"_id": 0}).to_list(limit * 2)
+    words = await word_loader.load_many([p["word_id"] for p in progress_docs])
     word_map = {w["id"]: w for w in words}
     
     due_words = []
@@ -2772,13 +3949,74 @@ async def get_review_words(limit: int = 20, current_user: dict = Depends(get_cur
             }
             due_words.append(item)
     
-    # Ensure we don't send more than requested
-    due_words = due_words[:limit]
-    return {"mode": "review", "words": due_words}
+    new_words = await _new_review_words(current_user["id"], min(limit - len(due_words), counts["new_available"]))
+    return {
+        "mode": "review" if due_words else "initial",
+        "words": due_words + new_words,
+        "due_count": counts["due_count"],
+        "new_count": len(new_words)
+    }
+
+
+@api_router.get("/learning/review-count")
+async def get_review_count(current_user: dict = Depends(get_current_user)):
+    """Badge counter: pending reviews and remaining new cards for today."""
+    return await review_queue_counts(current_user["id"], datetime.now(timezone.utc).date().isoformat())
+
+
+async def review_forecast(user_match: dict, days: int) -> List[dict]:
+    """Reviews due per day for the next ``days`` days; overdue cards count toward today."""
+    today = datetime.now(timezone.utc).date()
+    today_iso = today.isoformat()
+    last_day = (today + timedelta(days=days - 1)).isoformat()
+    rows = await db.user_word_progress.aggregate([
+        {"$match": {**user_match, "next_review": {"$lte": last_day}}},
+        {"$group": {"_id": {"$max": ["$next_review", today_iso]}, "count": {"$sum": 1}}}
+    ]).to_list(None)
+    counts = {row["_id"]: row["count"] for row in rows}
+    return [
+        {"date": day, "count": counts.get(day, 0)}
+        for day in ((today + timedelta(days=offset)).isoformat() for offset in range(days))
+    ]
+
+
+@api_router.get("/learning/review-forecast")
+async def get_review_forecast(days: int = 30, current_user: dict = Depends(get_current_user)):
+    """Upcoming review workload per day."""
+    days = min(max(days, 1), 365)
+    forecast = await review_forecast({"user_id": current_user["id"]}, days)
+    return {"days": days, "forecast": forecast, "total": sum(day["count"] for day in forecast)}
+
+
+@api_router.get("/teacher/classes/{class_name}/review-forecast")
+async def get_class_review_forecast(
+    class_name: str,
+    days: int = 30,
+    current_user: dict = Depends(require_role("teacher", "admin"))
+):
+    """Upcoming review workload per day summed over a class."""
+    days = min(max(days, 1), 365)
+    student_ids = await db.users.distinct("id", await scoped_student_filter(current_user, "class_name", class_name))
+    if not student_ids:
+        raise HTTPException(status_code=404, detail="Sınıfta öğrenci bulunamadı.")
+    forecast = await review_forecast({"user_id": {"$in": student_ids}}, days)
+    total = sum(day["count"] for day in forecast)
+    return {
+        "class_name": class_name,
+        "days": days,
+        "student_count": len(student_ids),
+        "forecast": forecast,
+        "total": total,
+        "average_per_student_per_day": round(total / (len(student_ids) * days), 2)
+    }
 
 
-def _update_srs(progress: dict, rating: str, today: datetime.date) -> dict:
-    """Small helper implementing simplified SM-2 style SRS updates."""
+def _update_srs(progress: dict, rating: str, today: datetime.date, interval_scale: float = 1.0) -> dict:
+    """Small helper implementing simplified SM-2 style SRS updates.
+
+    ``interval_days`` keeps the plain SM-2 interval; the review is scheduled
+    after that interval times the user's fitted ``interval_scale``.
+    """
     ease = float(progress.get("ease_factor", 2.5))
     interval = int(progress.get("interval_days", 1))
     repetition = int(progress.get("repetition", 0))
@@ -2799,7 +4037,7 @@ def _update_srs(progress: dict, rating: str, today: datetime.date) -> dict:
         interval = max(1, int(interval * ease * 1.3))
         ease += 0.15
     
-    next_review = (today + timedelta(days=interval)).isoformat()
+    next_review = (today + timedelta(days=max(1, round(interval * interval_scale)))).isoformat()
     
     progress.update(
         {
@@ -2808,40 +4046,196 @@ def _update_srs(progress: dict, rating: str, today: datetime.date) -> dict:
             "repetition": repetition,
             "next_review": next_review,
             "last_result": rating,
+            "last_reviewed_on": today.isoformat(),
         }
     )
     return progress
 
 
+async def apply_review_ratings(user_id: str, reviews: List[ReviewUpdate]) -> Dict[str, dict]:
+    """Apply ratings in order and persist the final SRS state per word.
+
+    One $in read for the existing progress and one unordered bulk_write,
+    whatever the number of ratings.
+    """
+    today = datetime.now(timezone.utc).date()
+    word_ids = list(dict.fromkeys(review.word_id for review in reviews))
+    existing = await db.user_word_progress.find(
+        {"user_id": user_id, "word_id": {"$in": word_ids}},
+        {"_id": 0}
+    ).to_list(len(word_ids))
+    progress_by_word = {p["word_id"]: p for p in existing}
+    parameters = await db.srs_parameters.find_one({"user_id": user_id}, {"_id": 0, "interval_scale": 1})
+    interval_scale = parameters["interval_scale"] if parameters else 1.0
+
+    reviewed_at = datetime.now(timezone.utc).isoformat()
+    review_log = []
+    for review in reviews:
+        progress = progress_by_word.get(review.word_id) or UserWordProgress(
+            user_id=user_id,
+            word_id=review.word_id,
+            last_result=review.rating,
+        ).model_dump()
+        last_reviewed_on = progress.get("last_reviewed_on")
+        review_log.append({
+            "user_id": user_id,
+            "word_id": review.word_id,
+            "rating": review.rating,
+            "reviewed_at": reviewed_at,
+            # State the rating was given in: days since the previous review and the SM-2 interval
+            "elapsed_days": (today - date.fromisoformat(last_reviewed_on)).days if last_reviewed_on else None,
+            "interval_before": int(progress.get("interval_days", 1)),
+            "ease_before": float(progress.get("ease_factor", 2.5)),
+            "repetition_before": int(progress.get("repetition", 0))
+        })
+        progress_by_word[review.word_id] = _update_srs(progress, review.rating, today, interval_scale)
+
+    await db.user_word_progress.bulk_write(
+        [
+            UpdateOne({"user_id": user_id, "word_id": word_id}, {"$set": progress_by_word[word_id]}, upsert=True)
+            for word_id in word_ids
+        ],
+        ordered=False
+    )
+    # Logged only once applied: a failed progress write that the client
+    # retries must not leave unapplied or doubled ratings for the fit.
+    # Best effort, a missing entry only drops one sample from the fit.
+    try:
+        await db.review_log.insert_many(review_log, ordered=False)
+    except PyMongoError:
+        logger.exception(f"Review log not written for user {user_id}")
+    return {word_id: progress_by_word[word_id] for word_id in word_ids}
+
+
 @api_router.post("/learning/review-result")
 async def update_review_result(update: ReviewUpdate, current_user: dict = Depends(get_current_user)):
     """
     Update spaced repetition progress after the user reviews a word.
     """
-    today = datetime.now(timezone.utc)
-    existing = await db.user_word_progress.find_one(
-        {"user_id": current_user["id"], "word_id": update.word_id},
-        {"_id": 0}
+    progress = await apply_review_ratings(current_user["id"], [update])
+    return {"message": "Review updated", "progress": progress[update.word_id]}
+
+
+@api_router.post("/learning/review-results")
+async def update_review_results(batch: ReviewBatchUpdate, current_user: dict = Depends(get_current_user)):
+    """
+    Submit every rating of a review session at once.
+    """
+    progress = await apply_review_ratings(current_user["id"], batch.reviews)
+    return {"message": "Reviews updated", "updated": len(progress), "progress": list(progress.values())}
+
+# ----- SRS parameter fitting -----
+#
+# review_log is append-only, one document per rating. fit_srs_parameters
+# fits each user's interval_scale offline, FSRS style: memory stability is
+# modelled as S = scale * interval_before and recall after t days as the
+# FSRS power forgetting curve R = (1 + FACTOR * t / S) ** DECAY, which is
+# 0.9 exactly at t = S. The scale with the best log-likelihood on a grid
+# becomes the multiplier for scheduled intervals, so reviews land near 90%
+# retention instead of the fixed SM-2 guess.
+SRS_DECAY = -0.5
+SRS_FACTOR = 19 / 81
+SRS_SCALE_GRID = np.exp(np.linspace(np.log(0.25), np.log(4.0), 41))
+SRS_MIN_REVIEWS = 50
+SRS_FIT_WINDOW = timedelta(days=365)
+SRS_FIT_CHUNK = 200_000
+SRS_LOAD_CHUNK = 50_000
+
+def fit_interval_scales(user_index: np.ndarray, elapsed: np.ndarray, interval: np.ndarray,
+                        recalled: np.ndarray, user_count: int) -> tuple:
+    """Grid-search maximum likelihood scale per user, vectorized over reviews and grid.
+
+    Reviews are processed in chunks so memory stays at chunk x grid floats.
+    """
+    per_user = np.zeros((user_count, len(SRS_SCALE_GRID)))
+    for start in range(0, len(user_index), SRS_FIT_CHUNK):
+        rows = slice(start, start + SRS_FIT_CHUNK)
+        stability = interval[rows, None] * SRS_SCALE_GRID[None, :]
+        retrievability = np.clip((1 + SRS_FACTOR * elapsed[rows, None] / stability) ** SRS_DECAY, 1e-6, 1 - 1e-6)
+        log_likelihood = np.where(recalled[rows, None], np.log(retrievability), np.log1p(-retrievability))
+        for g in range(len(SRS_SCALE_GRID)):
+            per_user[:, g] += np.bincount(user_index[rows], weights=log_likelihood[:, g], minlength=user_count)
+    best = per_user.argmax(axis=1)
+    return SRS_SCALE_GRID[best], per_user[np.arange(user_count), best]
+
+async def load_review_arrays(since: str) -> tuple:
+    """Stream the review log into NumPy columns, SRS_LOAD_CHUNK documents at a time.
+
+    Returns (user_ids, user_index, elapsed, interval, recalled); each chunk is
+    converted to compact arrays straight away, so no per-row Python lists
+    outlive a chunk.
+    """
+    user_ids: Dict[str, int] = {}
+    chunks: Dict[str, List[np.ndarray]] = {"user": [], "elapsed": [], "interval": [], "recalled": []}
+    cursor = db.review_log.find(
+        {"reviewed_at": {"$gte": since}, "elapsed_days": {"$gt": 0}},
+        {"_id": 0, "user_id": 1, "elapsed_days": 1, "interval_before": 1, "rating": 1}
+    ).batch_size(SRS_LOAD_CHUNK)
+    while entries := await cursor.to_list(SRS_LOAD_CHUNK):
+        count = len(entries)
+        chunks["user"].append(np.fromiter(
+            (user_ids.setdefault(e["user_id"], len(user_ids)) for e in entries), dtype=np.int32, count=count
+        ))
+        chunks["elapsed"].append(np.fromiter((e["elapsed_days"] for e in entries), dtype=np.float32, count=count))
+        chunks["interval"].append(np.fromiter((e["interval_before"] for e in entries), dtype=np.float32, count=count))
+        chunks["recalled"].append(np.fromiter((e["rating"] != "again" for e in entries), dtype=bool, count=count))
+    if not user_ids:
+        return user_ids, None, None, None, None
+    return (
+        user_ids,
+        np.concatenate(chunks["user"]),
+        np.concatenate(chunks["elapsed"]),
+        np.maximum(np.concatenate(chunks["interval"]), 1),
+        np.concatenate(chunks["recalled"])
     )
-    
-    if not existing:
-        progress = UserWordProgress(
-            user_id=current_user["id"],
-            word_id=update.word_id,
-            last_result=update.rating,
-        ).model_dump()
-    else:
-        progress = dict(existing)
-    
-    progress = _update_srs(progress, update.rating, today.date())
-    
-    await db.user_word_progress.update_one(
-        {"user_id": current_user["id"], "word_id": update.word_id},
-        {"$set": progress},
-        upsert=True
+
+async def fit_srs_parameters():
+    """Refit interval_scale for every user with enough logged reviews.
+
+    Meant to run offline: ``python fit_srs_parameters.py`` from cron, or in
+    the background via /admin/maintenance/fit-srs-parameters.
+    """
+    since = (datetime.now(timezone.utc) - SRS_FIT_WINDOW).isoformat()
+    user_ids, user_index, elapsed, interval, recalled = await load_review_arrays(since)
+    if not user_ids:
+        return 0
+
+    counts = np.bincount(user_index, minlength=len(user_ids))
+    loop = asyncio.get_running_loop()
+    scales, log_likelihood = await loop.run_in_executor(
+        None, fit_interval_scales, user_index, elapsed, interval, recalled, len(user_ids)
     )
-    
-    return {"message": "Review updated", "progress": progress}
+
+    fitted_at = datetime.now(timezone.utc).isoformat()
+    updates = [
+        UpdateOne(
+            {"user_id": user_id},
+            {"$set": {
+                "interval_scale": round(float(scales[i]), 4),
+                "review_count": int(counts[i]),
+                "log_likelihood": float(log_likelihood[i]),
+                "fitted_at": fitted_at
+            }},
+            upsert=True
+        )
+        for user_id, i in user_ids.items()
+        if counts[i] >= SRS_MIN_REVIEWS
+    ]
+    for start in range(0, len(updates), 1000):
+        await db.srs_parameters.bulk_write(updates[start:start + 1000], ordered=False)
+    logger.info(f"SRS parameters fitted for {len(updates)} users")
+    return len(updates)
+
+_srs_fit_task: Optional[asyncio.Task] = None
+
+@api_router.post("/admin/maintenance/fit-srs-parameters", status_code=status.HTTP_202_ACCEPTED)
+async def run_srs_parameter_fit(current_user: dict = Depends(require_role("admin"))):
+    """Start the fit in the background; the request does not wait for it."""
+    global _srs_fit_task
+    if _srs_fit_task is not None and not _srs_fit_task.done():
+        return {"message": "Tekrar parametreleri zaten hesaplanıyor.", "running": True}
+    _srs_fit_task = asyncio.create_task(single_flight("fit_srs_parameters", fit_srs_parameters))
+    return {"message": "Tekrar parametreleri hesaplanmaya başlandı.", "running": True}
 
 class TrackErrorRequest(BaseModel):
     word_id: str
@@ -2861,12 +4255,18 @@ async def track_word_error(request: TrackErrorRequest, current_user: dict = Depe
         {"id": current_user["id"]},
         {"$set": {"word_errors": word_errors}}
     )
+    if user.get("role") == "student":
+        await record_class_word_error(user, word_id)
     
     return {"message": "Error tracked", "errors": word_errors}
 
 
 @api_router.get("/learning/hard-words")
-async def get_hard_words(limit: int = 5, current_user: dict = Depends(get_current_user)):
+async def get_hard_words(
+    limit: int = 5,
+    current_user: dict = Depends(get_current_user),
+    word_loader: WordLoader = Depends(get_word_loader)
+):
     """
     Return the user's most difficult words based on per-word error counts.
     """
@@ -2881,7 +4281,7 @@ async def get_hard_words(limit: int = 5, current_user: dict = Depends(get_curren
     sorted_items = sorted(word_errors.items(), key=lambda x: x[1], reverse=True)[: limit * 2]
     word_ids = [word_id for word_id, _ in sorted_items]
     
-    words = await db.words.find({"id": {"$in": word_ids}}, {"_id": 0}).to_list(limit * 2)
+    words = await word_loader.load_many(word_ids)
     word_map = {w["id"]: w for w in words}
     
     result = []
@@ -3195,48 +4595,78 @@ async def get_story_history(current_user: dict = Depends(get_current_user)):
 
 # ============= TEACHER REPORT PANEL =============
 
+REPORT_STUDENT_PROJECTION = {
+    "_id": 0, "id": 1, "username": 1, "class_name": 1, "word_errors": 1, "last_login_date": 1,
+    "last_activity": 1, "level": 1, "xp": 1, "words_learned": 1, "streak": 1
+}
+
+async def weekly_words_by_student(user_ids: List[str], week_start: str, week_end: str) -> Dict[str, int]:
+    """Correct answers per student in the week, one $group on the (created_at, user_id) index."""
+    if not user_ids:
+        return {}
+    pipeline = [
+        {"$match": {"created_at": {"$gte": week_start, "$lte": week_end}, "user_id": {"$in": user_ids}}},
+        {"$group": {"_id": "$user_id", "weekly_words": {"$sum": "$correct_answers"}}}
+    ]
+    rows = await db.game_scores.aggregate(pipeline).to_list(None)
+    return {row["_id"]: row["weekly_words"] for row in rows}
+
+def _student_report(student: dict, weekly_words: int) -> dict:
+    # Get error categories
+    word_errors = student.get("word_errors", {}) or {}
+    sorted_errors = sorted(word_errors.items(), key=lambda x: x[1], reverse=True)
+    top_errors = {cat: count for cat, count in sorted_errors[:5]}
+    return {
+        "student_id": student["id"],
+        "username": student["username"],
+        "class_name": student.get("class_name"),
+        "weekly_words": weekly_words,
+        "errors_by_category": top_errors,
+        "last_login": student.get("last_login_date") or student.get("last_activity"),
+        "level": student.get("level", 1),
+        "xp": student.get("xp", 0),
+        "words_learned_total": student.get("words_learned", 0),
+        "streak": student.get("streak", 0)
+    }
+
 @api_router.get("/teacher/reports/students")
-async def get_student_reports(current_user: dict = Depends(require_role("teacher", "admin"))):
-    """Get detailed student reports for teacher"""
-    students = await db.users.find(
-        {"role": "student"},
-        {"_id": 0, "password": 0}
-    ).to_list(1000)
-    
-    # Calculate weekly stats for each student
-    now = datetime.now(timezone.utc)
-    week_start = (now - timedelta(days=now.weekday())).isoformat()
-    week_end = (now + timedelta(days=6-now.weekday())).isoformat()
-    
-    reports = []
-    for student in students:
-        # Get weekly game scores
-        weekly_scores = await db.game_scores.find({
-            "user_id": student["id"],
-            "created_at": {"$gte": week_start, "$lte": week_end}
-        }).to_list(100)
-        
-        weekly_words = sum(score.get("correct_answers", 0) for score in weekly_scores)
-        
-        # Get error categories
-        word_errors = student.get("word_errors", {})
-        sorted_errors = sorted(word_errors.items(), key=lambda x: x[1], reverse=True)
-        top_errors = {cat: count for cat, count in sorted_errors[:5]}
-        
-        reports.append({
-            "student_id": student["id"],
-            "username": student["username"],
-            "class_name": student.get("class_name"),
-            "weekly_words": weekly_words,
-            "errors_by_category": top_errors,
-            "last_login": student.get("last_login_date") or student.get("last_activity"),
-            "level": student.get("level", 1),
-            "xp": student.get("xp", 0),
-            "words_learned_total": student.get("words_learned", 0),
-            "streak": student.get("streak", 0)
-        })
-    
-    return {"reports": reports}
+async def get_student_reports(
+    page: int = 1,
+    page_size: int = 200,
+    current_user: dict = Depends(require_role("teacher", "admin"))
+):
+    """Get detailed student reports for teacher (paginated by username)"""
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), 1000)
+
+    student_filter = await teacher_student_filter(current_user)
+    total = await db.users.count_documents(student_filter)
+    students = await db.users.find(student_filter, REPORT_STUDENT_PROJECTION).sort(
+        [("username", 1), ("id", 1)]
+    ).skip((page - 1) * page_size).limit(page_size).to_list(page_size)
+
+    week_start, week_end = get_week_range()
+    weekly_words = await weekly_words_by_student([s["id"] for s in students], week_start, week_end)
+
+    reports = [_student_report(student, weekly_words.get(student["id"], 0)) for student in students]
+    return {"reports": reports, "total": total, "page": page, "page_size": page_size}
+
+def _parent_report(student: dict, weekly_words: int, week_start: str, week_end: str) -> dict:
+    """Weekly summary sent to parents; shared by the PDF endpoint and report jobs."""
+    word_errors = student.get("word_errors", {}) or {}
+    sorted_errors = sorted(word_errors.items(), key=lambda x: x[1], reverse=True)
+    return {
+        "student_id": student["id"],
+        "student_name": student["username"],
+        "class_name": student.get("class_name"),
+        "week_start": week_start,
+        "week_end": week_end,
+        "weekly_words": weekly_words,
+        "total_words": student.get("words_learned", 0),
+        "top_error_category": sorted_errors[0][0] if sorted_errors else "None",
+        "level": student.get("level", 1),
+        "streak": student.get("streak", 0)
+    }
 
 @api_router.post("/teacher/reports/generate-pdf")
 async def generate_student_pdf_report(student_id: str, current_user: dict = Depends(require_role("teacher", "admin"))):
@@ -3260,22 +4690,10 @@ async def generate_student_pdf_report(student_id: str, current_user: dict = Depe
     # Get error categories
     word_errors = student.get("word_errors", {})
     sorted_errors = sorted(word_errors.items(), key=lambda x: x[1], reverse=True)
-    top_error_category = sorted_errors[0][0] if sorted_errors else "None"
-    
-    # Generate report data
-    report_data = {
-        "student_name": student["username"],
-        "week_start": week_start,
-        "week_end": week_end,
-        "weekly_words": weekly_words,
-        "total_words": student.get("words_learned", 0),
-        "top_error_category": top_error_category,
-        "level": student.get("level", 1),
-        "streak": student.get("streak", 0)
-    }
+    report_data = _parent_report(student, weekly_words, week_start, week_end)
+    top_error_category = report_data["top_error_category"]
     
-    # In production, generate actual PDF using reportlab or similar
-    # For now, return JSON data that frontend can convert to PDF
+    # The rendered PDF is served by /teacher/reports/students/{id}/pdf
     report = TeacherReport(
         teacher_id=current_user["id"],
         student_id=student_id,
@@ -3284,7 +4702,8 @@ async def generate_student_pdf_report(student_id: str, current_user: dict = Depe
         words_learned=weekly_words,
         errors_by_category={cat: count for cat, count in sorted_errors[:5]},
         last_login=student.get("last_login_date"),
-        level=student.get("level", 1)
+        level=student.get("level", 1),
+        pdf_url=f"/api/teacher/reports/students/{student_id}/pdf"
     )
     
     await db.teacher_reports.insert_one(report.model_dump())
@@ -3295,18 +4714,359 @@ async def generate_student_pdf_report(student_id: str, current_user: dict = Depe
         "report_id": report.id
     }
 
+# ----- Report jobs -----
+#
+# Class and institution reports run in the background: a job resolves its
+# students once, then chunks of REPORT_JOB_CHUNK students are computed by
+# at most REPORT_JOB_WORKERS concurrent workers (shared by all jobs). The
+# finished report list is stored in report_artifacts under a key made of
+# the resolved student filter and the week, so the same request is served
+# from the artifact until the week rolls over.
+#
+# Every uvicorn worker may try to run a job, so a run first claims it with
+# a fresh claim_id; progress and completion writes only apply while that
+# claim is still current. A running job whose heartbeat is older than
+# REPORT_JOB_STALE_AFTER was abandoned and may be claimed again.
+REPORT_JOB_WORKERS = 4
+REPORT_JOB_CHUNK = 200
+REPORT_JOB_STALE_AFTER = timedelta(minutes=15)
+_report_workers = asyncio.Semaphore(REPORT_JOB_WORKERS)
+_report_job_tasks: set = set()
+
+REPORT_SCOPE_FIELDS = {"student": "id", "class": "class_name", "institution": "institution_id"}
+
+def _report_cache_key(student_filter: dict, week_start: str) -> str:
+    raw = json.dumps({"filter": student_filter, "week_start": week_start}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+async def claim_report_job(job_id: str) -> Optional[dict]:
+    """Atomically take a queued or abandoned job; None when another worker holds it."""
+    now = datetime.now(timezone.utc)
+    return await db.report_jobs.find_one_and_update(
+        {"id": job_id, "$or": [
+            {"status": "queued"},
+            {"status": "running", "heartbeat_at": {"$lt": (now - REPORT_JOB_STALE_AFTER).isoformat()}}
+        ]},
+        {"$set": {
+            "status": "running",
+            "completed": 0,
+            "claim_id": str(uuid.uuid4()),
+            "heartbeat_at": now.isoformat()
+        }},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+
+async def _report_chunk(claim: dict, students: List[dict], week_start: str, week_end: str) -> List[dict]:
+    async with _report_workers:
+        weekly_words = await weekly_words_by_student([s["id"] for s in students], week_start, week_end)
+        reports = [
+            _parent_report(student, weekly_words.get(student["id"], 0), week_start, week_end)
+            for student in students
+        ]
+        await db.report_jobs.update_one(
+            claim,
+            {"$inc": {"completed": len(students)}, "$set": {"heartbeat_at": datetime.now(timezone.utc).isoformat()}}
+        )
+        return reports
+
+async def run_report_job(job_id: str):
+    """Claim a report job, compute it and attach its artifact."""
+    job = await claim_report_job(job_id)
+    if job is None:
+        return
+    claim = {"id": job["id"], "claim_id": job["claim_id"]}
+    try:
+        students = await db.users.find(
+            json.loads(job["student_filter"]), REPORT_STUDENT_PROJECTION
+        ).sort([("username", 1), ("id", 1)]).to_list(None)
+        await db.report_jobs.update_one(claim, {"$set": {"total": len(students)}})
+
+        chunks = await asyncio.gather(*(
+            _report_chunk(claim, students[i:i + REPORT_JOB_CHUNK], job["week_start"], job["week_end"])
+            for i in range(0, len(students), REPORT_JOB_CHUNK)
+        ))
+        artifact = {
+            "id": str(uuid.uuid4()),
+            "cache_key": job["cache_key"],
+            "scope": job["scope"],
+            "target_id": job["target_id"],
+            "week_start": job["week_start"],
+            "week_end": job["week_end"],
+            "reports": [report for chunk in chunks for report in chunk],
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }
+        artifact = await get_or_create(db.report_artifacts, {"cache_key": job["cache_key"]}, artifact)
+        # Artifacts of past weeks are never served again
+        await db.report_artifacts.delete_many({"week_start": {"$lt": job["week_start"]}})
+        await db.report_jobs.update_one(
+            claim,
+            {"$set": {
+                "status": "completed",
+                "artifact_id": artifact["id"],
+                "finished_at": datetime.now(timezone.utc).isoformat()
+            }}
+        )
+    except Exception as exc:
+        logger.exception(f"Report job {job['id']} failed")
+        await db.report_jobs.update_one(
+            claim,
+            {"$set": {"status": "failed", "error": str(exc), "finished_at": datetime.now(timezone.utc).isoformat()}}
+        )
+
+def _start_report_job(job_id: str):
+    task = asyncio.create_task(run_report_job(job_id))
+    _report_job_tasks.add(task)
+    task.add_done_callback(_report_job_tasks.discard)
+
+async def resume_report_jobs():
+    """Restart jobs left behind by a stopped process: stale running ones and long-queued ones."""
+    now = datetime.now(timezone.utc)
+    stale_before = (now - REPORT_JOB_STALE_AFTER).isoformat()
+    abandoned = {"$or": [
+        {"status": "queued", "created_at": {"$lt": stale_before}},
+        {"status": "running", "heartbeat_at": {"$lt": stale_before}}
+    ]}
+    async for job in db.report_jobs.find(abandoned, {"_id": 0, "id": 1}):
+        _start_report_job(job["id"])
+
+@api_router.post("/teacher/reports/jobs")
+async def create_report_job(
+    job_data: ReportJobCreate,
+    current_user: dict = Depends(require_role("teacher", "admin"))
+):
+    target_id = job_data.target_id.strip()
+    if not target_id:
+        raise HTTPException(status_code=400, detail="Rapor hedefi boş olamaz.")
+
+    student_filter = await scoped_student_filter(current_user, REPORT_SCOPE_FIELDS[job_data.scope], target_id)
+    if not await db.users.find_one(student_filter, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Rapor için öğrenci bulunamadı.")
+
+    week_start, week_end = get_week_range()
+    cache_key = _report_cache_key(student_filter, week_start)
+    artifact = await db.report_artifacts.find_one({"cache_key": cache_key}, {"_id": 0, "id": 1, "reports": 1})
+    if not artifact:
+        pending = await db.report_jobs.find_one(
+            {"cache_key": cache_key, "status": {"$in": ["queued", "running"]}},
+            {"_id": 0, "id": 1, "status": 1}
+        )
+        if pending:
+            return {"job_id": pending["id"], "status": pending["status"]}
+
+    job = ReportJob(
+        teacher_id=current_user["id"],
+        scope=job_data.scope,
+        target_id=target_id,
+        cache_key=cache_key,
+        week_start=week_start,
+        week_end=week_end
+    )
+    job_doc = job.model_dump()
+    # Stored as JSON: operator keys like $in are not valid stored field names
+    job_doc["student_filter"] = json.dumps(student_filter)
+    if artifact:
+        job_doc.update({
+            "status": "completed",
+            "total": len(artifact["reports"]),
+            "completed": len(artifact["reports"]),
+            "artifact_id": artifact["id"],
+            "finished_at": job_doc["created_at"]
+        })
+    await db.report_jobs.insert_one(job_doc)
+    if not artifact:
+        _start_report_job(job.id)
+    return {"job_id": job.id, "status": job_doc["status"]}
+
+@api_router.get("/teacher/reports/jobs/{job_id}")
+async def get_report_job(job_id: str, current_user: dict = Depends(require_role("teacher", "admin"))):
+    job_filter = {"id": job_id}
+    if current_user.get("role") != "admin":
+        job_filter["teacher_id"] = current_user["id"]
+    job = await db.report_jobs.find_one(job_filter, {"_id": 0, "student_filter": 0, "cache_key": 0, "claim_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Rapor işi bulunamadı.")
+
+    job["progress"] = round(job["completed"] / job["total"], 3) if job.get("total") else 0
+    if job["status"] == "completed":
+        artifact = await db.report_artifacts.find_one({"id": job["artifact_id"]}, {"_id": 0, "reports": 1})
+        if artifact is None:
+            # The week rolled over and the artifact was pruned
+            raise HTTPException(status_code=410, detail="Rapor süresi doldu, lütfen yeniden oluşturun.")
+        job["reports"] = artifact["reports"]
+    return job
+
+# ----- PDF parent reports -----
+#
+# reportlab rendering is CPU bound, so it runs in a process pool and the
+# event loop only awaits the finished bytes. Class archives are streamed:
+# REPORT_PDF_BATCH reports are rendered at a time, written into the zip
+# and flushed to the client before the next batch is read from the cursor.
+REPORT_PDF_WORKERS = int(os.environ.get("REPORT_PDF_WORKERS", min(4, os.cpu_count() or 1)))
+REPORT_PDF_BATCH = REPORT_PDF_WORKERS * 2
+REPORT_FONT_PATH = os.environ.get("REPORT_FONT_PATH", "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf")
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_font: Optional[str] = None
+
+# Base-14 fonts have no glyphs for these, fold them when no TTF is available
+_TURKISH_FOLD = str.maketrans("ğĞışŞİ", "gGisSI")
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    if _pdf_pool is None:
+        # spawn, not the Linux default fork: this process already runs Motor and
+        # executor threads, and a forked child can inherit their held locks
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=REPORT_PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pdf_pool
+
+def _report_font() -> str:
+    global _pdf_font
+    if _pdf_font is None:
+        try:
+            pdfmetrics.registerFont(TTFont("ReportFont", REPORT_FONT_PATH))
+            _pdf_font = "ReportFont"
+        except Exception:
+            _pdf_font = "Helvetica"
+    return _pdf_font
+
+def render_parent_report_pdf(report: dict) -> bytes:
+    """Render one _parent_report dict to PDF bytes (runs in a pool worker)."""
+    font = _report_font()
+    text = (lambda value: str(value)) if font != "Helvetica" else (lambda value: str(value).translate(_TURKISH_FOLD))
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    pdf.setTitle(text(f"{report['student_name']} - Haftalık Rapor"))
+
+    pdf.setFont(font, 18)
+    pdf.drawString(50, height - 70, text("LexiMind Pro - Haftalık Veli Raporu"))
+    pdf.setFont(font, 11)
+    pdf.drawString(50, height - 92, text(f"Hafta: {report['week_start'][:10]} / {report['week_end'][:10]}"))
+
+    rows = [
+        ("Öğrenci", report["student_name"]),
+        ("Sınıf", report.get("class_name") or "-"),
+        ("Bu hafta öğrenilen kelime", report["weekly_words"]),
+        ("Toplam öğrenilen kelime", report["total_words"]),
+        ("Seviye", report["level"]),
+        ("Günlük seri", report["streak"]),
+        ("En çok zorlandığı kelime", report.get("top_error_word") or "-"),
+    ]
+    y = height - 140
+    pdf.setFont(font, 12)
+    for label, value in rows:
+        pdf.drawString(50, y, text(label))
+        pdf.drawString(260, y, text(value))
+        y -= 24
+
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+async def _attach_error_words(reports: List[dict]):
+    """Replace top error word ids with the English word for display."""
+    word_ids = {r["top_error_category"] for r in reports if r["top_error_category"] != "None"}
+    if not word_ids:
+        return
+    words = await db.words.find({"id": {"$in": list(word_ids)}}, {"_id": 0, "id": 1, "english": 1}).to_list(None)
+    english = {w["id"]: w.get("english") for w in words}
+    for report in reports:
+        report["top_error_word"] = english.get(report["top_error_category"])
+
+async def _render_reports(students: List[dict], week_start: str, week_end: str) -> List[tuple]:
+    weekly_words = await weekly_words_by_student([s["id"] for s in students], week_start, week_end)
+    reports = [
+        _parent_report(student, weekly_words.get(student["id"], 0), week_start, week_end)
+        for student in students
+    ]
+    await _attach_error_words(reports)
+    loop = asyncio.get_running_loop()
+    pdfs = await asyncio.gather(*(
+        loop.run_in_executor(get_pdf_pool(), render_parent_report_pdf, report) for report in reports
+    ))
+    return list(zip(reports, pdfs))
+
+class _ZipChunkSink:
+    """Write-only file object for zipfile; drain() hands the written bytes to the response."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def _report_filename(report: dict) -> str:
+    safe_name = re.sub(r"[^\w.-]+", "_", report["student_name"]).strip("_") or report["student_id"]
+    return f"{safe_name}_{report['week_start'][:10]}.pdf"
+
+@api_router.get("/teacher/reports/students/{student_id}/pdf")
+async def download_student_report_pdf(student_id: str, current_user: dict = Depends(require_role("teacher", "admin"))):
+    student = await db.users.find_one(
+        await scoped_student_filter(current_user, "id", student_id), REPORT_STUDENT_PROJECTION
+    )
+    if not student:
+        raise HTTPException(status_code=404, detail="Öğrenci bulunamadı.")
+
+    week_start, week_end = get_week_range()
+    [(report, pdf_bytes)] = await _render_reports([student], week_start, week_end)
+    return Response(
+        content=pdf_bytes,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="{_report_filename(report)}"'}
+    )
+
+@api_router.get("/teacher/reports/classes/{class_name}/pdf-archive")
+async def download_class_report_archive(class_name: str, current_user: dict = Depends(require_role("teacher", "admin"))):
+    student_filter = await scoped_student_filter(current_user, "class_name", class_name)
+    if not await db.users.find_one(student_filter, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Sınıfta öğrenci bulunamadı.")
+    week_start, week_end = get_week_range()
+
+    async def archive_chunks():
+        sink = _ZipChunkSink()
+        # An unseekable sink makes zipfile write data descriptors instead of seeking back
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            cursor = db.users.find(student_filter, REPORT_STUDENT_PROJECTION).sort([("username", 1), ("id", 1)])
+            batch: List[dict] = []
+            async for student in cursor:
+                batch.append(student)
+                if len(batch) < REPORT_PDF_BATCH:
+                    continue
+                for report, pdf_bytes in await _render_reports(batch, week_start, week_end):
+                    archive.writestr(_report_filename(report), pdf_bytes)
+                batch = []
+                yield sink.drain()
+            if batch:
+                for report, pdf_bytes in await _render_reports(batch, week_start, week_end):
+                    archive.writestr(_report_filename(report), pdf_bytes)
+        yield sink.drain()
+
+    archive_name = re.sub(r"[^\w.-]+", "_", class_name) or "sinif"
+    return StreamingResponse(
+        archive_chunks(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{archive_name}_{week_start[:10]}.zip"'}
+    )
+
 @api_router.get("/teacher/reports/class-winners")
 async def get_class_winners(current_user: dict = Depends(require_role("teacher", "admin"))):
     """Get class winners from current season"""
     season = await get_current_season()
     
-    if season["status"] == "completed":
-        standings = season.get("final_standings", [])
-    else:
-        standings_response = await get_season_standings(current_user)
-        standings = standings_response.get("standings", [])
-    
-    top_10 = standings[:10]
+    top_10 = await load_season_standings(season, 10)
     
     return {
         "season": season["season_number"],
@@ -3314,6 +5074,100 @@ async def get_class_winners(current_user: dict = Depends(require_role("teacher",
         "message": f"Sezon {season['season_number']} - İlk 3'e özel rozet kazandı!"
     }
 
+# ============= CSV EXPORTS =============
+
+# Exports read the cursor EXPORT_BATCH_SIZE documents at a time and flush
+# each batch as CSV bytes, so memory does not grow with the row count.
+EXPORT_BATCH_SIZE = 500
+
+async def batched(cursor, size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[List[dict]]:
+    batch: List[dict] = []
+    async for document in cursor.batch_size(size):
+        batch.append(document)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def csv_response(filename: str, columns: List[str], row_batches: AsyncIterator[List[dict]]) -> StreamingResponse:
+    async def body():
+        buffer = io.StringIO()
+        # BOM so Excel opens the UTF-8 (Turkish) text correctly
+        buffer.write("\ufeff")
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        async for rows in row_batches:
+            writer.writerows(rows)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+        yield buffer.getvalue().encode("utf-8")
+
+    return StreamingResponse(
+        body(),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+REPORT_EXPORT_COLUMNS = [
+    "student_id", "username", "class_name", "weekly_words", "words_learned_total",
+    "level", "xp", "streak", "last_login", "top_errors"
+]
+
+@api_router.get("/teacher/reports/students/export.csv")
+async def export_student_reports(current_user: dict = Depends(require_role("teacher", "admin"))):
+    student_filter = await teacher_student_filter(current_user)
+    week_start, week_end = get_week_range()
+
+    async def rows():
+        cursor = db.users.find(student_filter, REPORT_STUDENT_PROJECTION).sort([("username", 1), ("id", 1)])
+        async for students in batched(cursor):
+            weekly_words = await weekly_words_by_student([s["id"] for s in students], week_start, week_end)
+            reports = []
+            for student in students:
+                report = _student_report(student, weekly_words.get(student["id"], 0))
+                report["top_errors"] = ";".join(f"{k}:{v}" for k, v in report.pop("errors_by_category").items())
+                reports.append(report)
+            yield reports
+
+    return csv_response(f"ogrenci_raporlari_{week_start[:10]}.csv", REPORT_EXPORT_COLUMNS, rows())
+
+SUMMARY_EXPORT_COLUMNS = [
+    "id", "username", "class_name", "points", "words_learned", "games_played", "streak",
+    "last_login_date", "average_quiz_score", "best_quiz_score", "last_quiz_score",
+    "last_quiz_submitted_at", "weekly_quiz_completion_count"
+]
+
+@api_router.get("/teacher/students/summary/export.csv")
+async def export_student_summary(current_user: dict = Depends(require_role("teacher", "admin"))):
+    student_filter = await teacher_student_filter(current_user)
+
+    async def rows():
+        cursor = db.users.find(student_filter, SUMMARY_STUDENT_PROJECTION).sort([("username", 1), ("id", 1)])
+        async for students in batched(cursor):
+            quiz_stats = {
+                row["_id"]: row
+                for row in await db.weekly_quiz_results.aggregate(
+                    quiz_summary_pipeline({"user_id": {"$in": [s["id"] for s in students]}})
+                ).to_list(None)
+            }
+            yield [_student_summary(student, quiz_stats.get(student["id"])) for student in students]
+
+    return csv_response("ogrenci_ozeti.csv", SUMMARY_EXPORT_COLUMNS, rows())
+
+WORD_EXPORT_COLUMNS = ["id", "english", "turkish", "difficulty", "category", "approved", "created_by", "created_at"]
+
+@api_router.get("/v1/words/export.csv")
+async def export_words(current_user: dict = Depends(require_role("admin", "teacher"))):
+    projection = {"_id": 0, **{column: 1 for column in WORD_EXPORT_COLUMNS}}
+
+    async def rows():
+        async for words in batched(db.words.find({}, projection).sort("english", 1)):
+            yield words
+
+    return csv_response("kelimeler.csv", WORD_EXPORT_COLUMNS, rows())
+
 # ============= XP & LEVEL SYSTEM =============
 
 @api_router.get("/user/profile")
@@ -3385,7 +5239,10 @@ async def update_daily_target(
 
 
 @api_router.get("/user/favorites")
-async def get_favorites(current_user: dict = Depends(get_current_user)):
+async def get_favorites(
+    current_user: dict = Depends(get_current_user),
+    word_loader: WordLoader = Depends(get_word_loader)
+):
     """Return user's favorite words."""
     user = await db.users.find_one({"id": current_user["id"]})
     if not user:
@@ -3395,7 +5252,7 @@ async def get_favorites(current_user: dict = Depends(get_current_user)):
     if not favorite_ids:
         return {"favorites": [], "words": []}
     
-    words = await db.words.find({"id": {"$in": favorite_ids}}, {"_id": 0}).to_list(len(favorite_ids))
+    words = await word_loader.load_many(favorite_ids)
     return {"favorites": favorite_ids, "words": words}
 
 
@@ -3444,6 +5301,12 @@ async def create_game_score_with_xp(score_create: GameScoreCreate, current_user:
     # Only save score to database if user is a student
     if not is_teacher_or_admin:
         await db.game_scores.insert_one(game_score.model_dump())
+        await record_daily_activity(
+            current_user["id"],
+            datetime.now(timezone.utc),
+            games_played=1,
+            correct_answers=score_create.correct_answers
+        )
     
     # Only update user stats with XP if user is a student
     if not is_teacher_or_admin:
@@ -3592,15 +5455,34 @@ async def startup_event():
         # Test MongoDB connection
         await client.admin.command('ping')
         logger.info("MongoDB connection successful")
+        await ensure_indexes()
         await initialize_data()
+        await resume_season_finalizations()
+        await resume_report_jobs()
         
         # Check and create weekly league if needed
         await check_weekly_reset()
         
         # Check and create/update season if needed
         await get_current_season()
+
+        # First start with the daily activity rollup: fill it from history in the background
+        if not await db.user_daily_activity.find_one({}, {"_id": 1}):
+            asyncio.create_task(single_flight("backfill_daily_activity", backfill_daily_activity))
+        asyncio.create_task(single_flight("backfill_student_institutions", backfill_student_institutions))
+        if not await db.class_actions.find_one({}, {"_id": 1}):
+            asyncio.create_task(single_flight("rebuild_class_actions", rebuild_class_actions))
+
+        # Pre-generate this week's quiz and warm the quiz cache
+        try:
+            await get_weekly_quiz_bundle(*get_week_range())
+        except ValueError as exc:
+            logger.warning(f"Weekly quiz not pre-generated: {exc}")
         
         logger.info("LexiMind Pro API started successfully")
+    except RequiredIndexError as e:
+        logger.error(f"Gerekli indeks oluşturulamadı, uygulama başlatılmıyor: {e}")
+        raise
     except Exception as e:
         logger.error("=" * 70)
         logger.error("MONGODB BAĞLANTI HATASI!")
@@ -3626,4 +5508,6 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    client.close()
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
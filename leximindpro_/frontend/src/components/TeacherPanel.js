@@ -2,6 +2,8 @@ import React, { useState, useEffect } from 'react';
 import './TeacherPanel.css';
 import GameSelector from './games/GameSelector';
 
+const SUMMARY_PAGE_SIZE = 200;
+
 function TeacherPanel({ user, apiUrl }) {
   const [showDashboard, setShowDashboard] = useState(true);
   const [activeTab, setActiveTab] = useState('overview');
@@ -10,6 +12,8 @@ function TeacherPanel({ user, apiUrl }) {
   const [statistics, setStatistics] = useState({});
   const [loading, setLoading] = useState(false);
   const [studentSummaries, setStudentSummaries] = useState([]);
+  const [summaryPage, setSummaryPage] = useState(1);
+  const [summaryTotal, setSummaryTotal] = useState(0);
   const [selectedStudentId, setSelectedStudentId] = useState(null);
   const [studentProfile, setStudentProfile] = useState(null);
   const [studentProfileLoading, setStudentProfileLoading] = useState(false);
@@ -146,10 +150,11 @@ function TeacherPanel({ user, apiUrl }) {
     setLoading(false);
   };
 
-  const fetchStudentSummaries = async () => {
+  const fetchStudentSummaries = async (page = 1) => {
     setLoading(true);
     try {
-      const response = await fetch(`${apiUrl}/teacher/students/summary`, {
+      const params = new URLSearchParams({ page, page_size: SUMMARY_PAGE_SIZE });
+      const response = await fetch(`${apiUrl}/teacher/students/summary?${params}`, {
         headers: {
           'Authorization': `Bearer ${localStorage.getItem('token')}`
         }
@@ -157,6 +162,8 @@ function TeacherPanel({ user, apiUrl }) {
       if (response.ok) {
         const data = await response.json();
         setStudentSummaries(data.students || []);
+        setSummaryPage(data.page || page);
+        setSummaryTotal(data.total || 0);
       }
     } catch (error) {
       console.error('Error fetching student summaries:', error);
@@ -1300,6 +1307,25 @@ function TeacherPanel({ user, apiUrl }) {
                     ))}
                   </tbody>
                 </table>
+                {summaryTotal > SUMMARY_PAGE_SIZE && (
+                  <div className="summary-pagination">
+                    <button
+                      onClick={() => fetchStudentSummaries(summaryPage - 1)}
+                      disabled={summaryPage <= 1}
+                    >
+                      ← Önceki
+                    </button>
+                    <span>
+                      Sayfa {summaryPage} / {Math.ceil(summaryTotal / SUMMARY_PAGE_SIZE)} ({summaryTotal} öğrenci)
+                    </span>
+                    <button
+                      onClick={() => fetchStudentSummaries(summaryPage + 1)}
+                      disabled={summaryPage * SUMMARY_PAGE_SIZE >= summaryTotal}
+                    >
+                      Sonraki →
+                    </button>
+                  </div>
+                )}
               </div>
             )}
           </div>
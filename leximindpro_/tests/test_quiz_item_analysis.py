@@ -0,0 +1,40 @@
+from server import _point_biserial
+
+
+def _stats(scores, correct_flags):
+    return {
+        "attempts": len(scores),
+        "correct": sum(correct_flags),
+        "score_sum": sum(scores),
+        "score_sq_sum": sum(score ** 2 for score in scores),
+        "correct_score_sum": sum(score for score, ok in zip(scores, correct_flags) if ok),
+    }
+
+
+def test_point_biserial_matches_hand_computed_value():
+    # Scores 100, 80 answered the item correctly, 60, 40 did not:
+    # mean 70, population sd sqrt(500), means 90 vs 50,
+    # r = (90 - 50) / sqrt(500) * sqrt(2 * 2 / 4 ** 2) = 0.894
+    assert _point_biserial(_stats([100, 80, 60, 40], [1, 1, 0, 0])) == 0.894
+
+
+def test_point_biserial_is_negative_when_weaker_students_answer_correctly():
+    assert _point_biserial(_stats([100, 80, 60, 40], [0, 0, 1, 1])) == -0.894
+
+
+def test_point_biserial_equals_pearson_correlation():
+    scores = [90, 75, 60, 85, 40, 55]
+    flags = [1, 1, 0, 1, 0, 1]
+    n = len(scores)
+    mean_x = sum(flags) / n
+    mean_y = sum(scores) / n
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(flags, scores)) / n
+    sd_x = (sum((x - mean_x) ** 2 for x in flags) / n) ** 0.5
+    sd_y = (sum((y - mean_y) ** 2 for y in scores) / n) ** 0.5
+    assert _point_biserial(_stats(scores, flags)) == round(cov / (sd_x * sd_y), 3)
+
+
+def test_point_biserial_undefined_without_variation():
+    assert _point_biserial(_stats([], [])) is None
+    assert _point_biserial(_stats([80, 60], [1, 1])) is None
+    assert _point_biserial(_stats([70, 70], [1, 0])) is None
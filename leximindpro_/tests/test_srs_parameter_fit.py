@@ -0,0 +1,48 @@
+import numpy as np
+
+import server
+from server import SRS_DECAY, SRS_FACTOR, SRS_SCALE_GRID, fit_interval_scales
+
+
+def _synthetic_reviews(true_scales, reviews_per_user, seed=7):
+    """Reviews whose recall follows the scheduler's own forgetting curve."""
+    rng = np.random.default_rng(seed)
+    user_index = np.repeat(np.arange(len(true_scales)), reviews_per_user)
+    interval = rng.integers(1, 30, size=user_index.size).astype(np.float64)
+    elapsed = rng.integers(1, 60, size=user_index.size).astype(np.float64)
+    stability = np.asarray(true_scales)[user_index] * interval
+    retrievability = (1 + SRS_FACTOR * elapsed / stability) ** SRS_DECAY
+    recalled = rng.random(user_index.size) < retrievability
+    return user_index, elapsed, interval, recalled
+
+
+def test_fit_recovers_known_scales():
+    true_scales = [0.5, 1.0, 2.5]
+    user_index, elapsed, interval, recalled = _synthetic_reviews(true_scales, 20000)
+
+    scales, log_likelihood = fit_interval_scales(user_index, elapsed, interval, recalled, len(true_scales))
+
+    np.testing.assert_allclose(scales, true_scales, rtol=0.15)
+    assert log_likelihood.shape == (len(true_scales),)
+    assert np.all(log_likelihood < 0)
+
+
+def test_fit_is_independent_of_chunking(monkeypatch):
+    user_index, elapsed, interval, recalled = _synthetic_reviews([0.8, 1.6], 3000)
+    whole = fit_interval_scales(user_index, elapsed, interval, recalled, 2)
+    monkeypatch.setattr(server, "SRS_FIT_CHUNK", 997)
+    chunked = fit_interval_scales(user_index, elapsed, interval, recalled, 2)
+
+    np.testing.assert_array_equal(whole[0], chunked[0])
+    np.testing.assert_allclose(whole[1], chunked[1])
+
+
+def test_users_who_always_forget_get_the_smallest_scale():
+    user_index = np.zeros(200, dtype=np.int32)
+    elapsed = np.full(200, 10.0)
+    interval = np.full(200, 10.0)
+    recalled = np.zeros(200, dtype=bool)
+
+    scales, _ = fit_interval_scales(user_index, elapsed, interval, recalled, 1)
+
+    assert scales[0] == SRS_SCALE_GRID.min()
@@ -0,0 +1,91 @@
+from server import apply_quiz_variant, grade_quiz_answers, localize_quiz_result, quiz_variant, sanitize_quiz_for_student
+
+QUIZ = {
+    "id": "quiz-1",
+    "questions": [
+        {"id": "q1", "prompt": "apple", "options": ["elma", "armut", "muz", "kiraz"], "correct_option_index": 0},
+        {"id": "q2", "prompt": "book", "options": ["masa", "kitap", "kalem", "defter"], "correct_option_index": 1},
+        {"id": "q3", "prompt": "house", "options": ["araba", "okul", "yol", "ev"], "correct_option_index": 3},
+    ],
+}
+
+
+def _student_view(user_id):
+    return apply_quiz_variant(sanitize_quiz_for_student(QUIZ, include_answers=True), user_id)
+
+
+def test_variant_is_deterministic_per_student():
+    assert quiz_variant(QUIZ, "student-a") == quiz_variant(QUIZ, "student-a")
+    variants = {repr(quiz_variant(QUIZ, f"student-{i}")) for i in range(10)}
+    assert len(variants) > 1
+
+
+def test_shown_correct_option_is_the_original_answer():
+    original = {q["id"]: q["options"][q["correct_option_index"]] for q in QUIZ["questions"]}
+    for user_id in ("student-a", "student-b", "student-c"):
+        view = _student_view(user_id)
+        assert sorted(q["id"] for q in view["questions"]) == ["q1", "q2", "q3"]
+        for question in view["questions"]:
+            assert question["options"][question["correct_option_index"]] == original[question["id"]]
+
+
+def test_shown_option_maps_back_to_original_index():
+    _, option_orders = quiz_variant(QUIZ, "student-a")
+    view = _student_view("student-a")
+    for question in view["questions"]:
+        original_options = next(q["options"] for q in QUIZ["questions"] if q["id"] == question["id"])
+        for shown, text in enumerate(question["options"]):
+            assert original_options[option_orders[question["id"]][shown]] == text
+
+
+def test_correct_answers_in_variant_grade_as_correct():
+    view = _student_view("student-a")
+    answers = [{"question_id": q["id"], "selected_option": q["correct_option_index"]} for q in view["questions"]]
+
+    evaluated, correct_count = grade_quiz_answers(QUIZ, "student-a", answers)
+
+    assert correct_count == 3
+    for answer in evaluated:
+        question = next(q for q in QUIZ["questions"] if q["id"] == answer["question_id"])
+        assert answer["is_correct"]
+        assert answer["selected_option"] == question["correct_option_index"]
+
+
+def test_wrong_answers_store_the_original_index_of_the_chosen_option():
+    view = _student_view("student-b")
+    answers = []
+    chosen_text = {}
+    for question in view["questions"]:
+        wrong = (question["correct_option_index"] + 1) % len(question["options"])
+        answers.append({"question_id": question["id"], "selected_option": wrong})
+        chosen_text[question["id"]] = question["options"][wrong]
+
+    evaluated, correct_count = grade_quiz_answers(QUIZ, "student-b", answers)
+
+    assert correct_count == 0
+    for answer in evaluated:
+        question = next(q for q in QUIZ["questions"] if q["id"] == answer["question_id"])
+        assert not answer["is_correct"]
+        assert question["options"][answer["selected_option"]] == chosen_text[answer["question_id"]]
+
+
+def test_invalid_answers_are_dropped():
+    answers = [
+        {"question_id": "q1", "selected_option": 7},
+        {"question_id": "q2", "selected_option": None},
+        {"question_id": "unknown", "selected_option": 0},
+    ]
+    assert grade_quiz_answers(QUIZ, "student-a", answers) == ([], 0)
+
+
+def test_localized_result_points_into_the_students_view():
+    view = _student_view("student-c")
+    answers = [{"question_id": q["id"], "selected_option": 2} for q in view["questions"]]
+    evaluated, _ = grade_quiz_answers(QUIZ, "student-c", answers)
+
+    localized = localize_quiz_result({"answers": evaluated}, QUIZ, "student-c")
+
+    shown = {q["id"]: q for q in view["questions"]}
+    for answer in localized["answers"]:
+        assert answer["selected_option"] == 2
+        assert answer["correct_option_index"] == shown[answer["question_id"]]["correct_option_index"]